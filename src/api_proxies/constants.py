@@ -0,0 +1,45 @@
+STEAMGRIDDB_HOST = 'www.steamgriddb.com'
+STEAM_CDN_HOST = 'steamcdn-a.akamaihd.net'
+STEAM_API_HOST = 'api.steampowered.com'
+
+# Token bucket settings per host: (requests per second, burst capacity).
+# Hosts not listed here are not rate limited.
+DEFAULT_RATE_LIMITS = {
+    STEAMGRIDDB_HOST: (5.0, 10),
+    STEAM_CDN_HOST: (20.0, 40),
+    STEAM_API_HOST: (5.0, 5),
+}
+
+DEFAULT_MAX_WORKERS = 16
+
+STEAMGRIDDB_CACHE_FILE_NAME = 'steamgriddb_cache.sqlite3'
+STEAMGRIDDB_CACHE_MAX_ENTRIES = 50000
+
+# How long a cached SteamGridDB response is served without asking the API again,
+# keyed by endpoint. The appid -> gameid mapping practically never changes.
+DAY_IN_SECONDS = 24 * 60 * 60
+STEAMGRIDDB_CACHE_TTLS = {
+    'games': 90 * DAY_IN_SECONDS,
+    'grids': 7 * DAY_IN_SECONDS,
+    'heroes': 7 * DAY_IN_SECONDS,
+    'logos': 7 * DAY_IN_SECONDS,
+}
+
+# Steam appids per request on SteamGridDB's multi-id platform endpoints
+STEAMGRIDDB_BATCH_SIZE = 50
+
+# (connect, read) timeout in seconds applied to every request without an explicit timeout
+DEFAULT_TIMEOUT = (10, 60)
+
+# Properties requested by Nextcloud PROPFIND listings, instead of the server's full set.
+# resourcetype is needed to tell folders apart from files.
+NEXTCLOUD_PROPFIND_BODY = (
+    '<?xml version="1.0"?>'
+    '<d:propfind xmlns:d="DAV:" xmlns:oc="http://owncloud.org/ns">'
+    '<d:prop>'
+    '<d:getlastmodified/><d:getetag/><d:getcontentlength/><d:resourcetype/><oc:checksums/>'
+    '</d:prop>'
+    '</d:propfind>'
+)
+
+NEXTCLOUD_COLLECTION_CACHE_FILE_NAME = 'nextcloud_collections.json'
@@ -0,0 +1,100 @@
+import threading
+import requests
+
+from api_proxies.constants import DEFAULT_MAX_WORKERS, DEFAULT_TIMEOUT
+from api_proxies.rate_limiter import acquire_for_url
+
+
+class HttpTransport:
+    """
+    A requests session with keep-alive connection pools sized for the thread pools that use it.
+    Every request gets a default timeout and is paced by the per-host rate limiter.
+    """
+    def __init__(self, pool_size=DEFAULT_MAX_WORKERS, timeout=DEFAULT_TIMEOUT, auth=None):
+        """
+        Args:
+            pool_size (int): Maximum number of kept-alive connections per host. Should match
+                             the number of threads issuing requests concurrently.
+            timeout (float or tuple): Default (connect, read) timeout in seconds.
+            auth (tuple, optional): Credentials applied to every request of this transport.
+        """
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.auth = auth
+        adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        acquire_for_url(url)
+        return self.session.request(method, url, **kwargs)
+
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+
+    def head(self, url, **kwargs):
+        return self.request('HEAD', url, **kwargs)
+
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+
+    def put(self, url, **kwargs):
+        return self.request('PUT', url, **kwargs)
+
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+
+    def get_stats(self):
+        """
+        Connection reuse per host for the pools that are still open.
+
+        Returns:
+            dict: Mapping of host to {'requests': int, 'connections': int}. Every request
+                  beyond the number of connections reused a kept-alive connection.
+        """
+        stats = {}
+        for adapter in set(self.session.adapters.values()):
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools[key]
+                host_stats = stats.setdefault(pool.host, {'requests': 0, 'connections': 0})
+                host_stats['requests'] += pool.num_requests
+                host_stats['connections'] += pool.num_connections
+        return stats
+
+
+    def close(self):
+        self.session.close()
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def configure_transport(pool_size=DEFAULT_MAX_WORKERS, timeout=DEFAULT_TIMEOUT):
+    """
+    Replace the transport shared by the Steam and SteamGridDB proxies.
+    """
+    global _transport
+    with _transport_lock:
+        if _transport is not None:
+            _transport.close()
+        _transport = HttpTransport(pool_size=pool_size, timeout=timeout)
+        return _transport
+
+
+def get_transport():
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = HttpTransport()
+        return _transport
@@ -1,12 +1,23 @@
-import os
 import urllib.parse
-import requests
 import xml.etree.ElementTree as ET
 from email.utils import parsedate_to_datetime
 
+from api_proxies.constants import DEFAULT_MAX_WORKERS, NEXTCLOUD_PROPFIND_BODY
+from api_proxies.http_transport import HttpTransport
+from api_proxies.nextcloud_collection_cache import NextcloudCollectionCache, get_collection_cache
+
+
+DAV_NS = '{DAV:}'
+OC_NS = '{http://owncloud.org/ns}'
+
+
+class PropfindRefusedError(Exception):
+    """The server refused a PROPFIND, typically because Depth infinity is disabled."""
+
 
 class NextcloudApiProxy:
-    def __init__(self, base_url, username, password):
+    def __init__(self, base_url, username, password, pool_size=DEFAULT_MAX_WORKERS,
+                 collection_cache: NextcloudCollectionCache = None):
         """
         Initialize the NextcloudManager.
 
@@ -15,12 +26,19 @@ class NextcloudApiProxy:
                             (e.g., 'https://nextcloud.example.com').
             username (str): The Nextcloud username (or email, if that's your login).
             password (str): The Nextcloud password.
+            pool_size (int): Number of kept-alive connections, should match the number
+                             of threads syncing files concurrently.
+            collection_cache (NextcloudCollectionCache, optional): Folders known to exist on the server.
+                                                                   Defaults to the shared, persisted cache.
         """
         self.base_url = base_url.rstrip('/')
         self.username = username
         self.auth = (username, password)
-        self.session = requests.Session()
-        self.session.auth = self.auth
+        self.transport = HttpTransport(pool_size=pool_size, auth=self.auth)
+        self.session = self.transport.session
+        self.collection_cache = collection_cache if collection_cache is not None else get_collection_cache()
+        # Folders are remembered per server and user
+        self.collection_server = self._get_remote_url('')
 
 
     def _get_remote_url(self, remote_path):
@@ -37,42 +55,37 @@ class NextcloudApiProxy:
         """
         Ensure that the remote folder (and its parent directories) exists on Nextcloud.
         If a folder does not exist, it is created.
+
+        Folders already known to exist cost no request. Otherwise the folder is created right
+        away with MKCOL and its parents are only created when the server reports them missing,
+        so a folder that exists costs one request instead of one PROPFIND per path component.
         """
-        parts = remote_folder.strip('/').split('/')
-        current_path = ""
-        for part in parts:
-            current_path = f"{current_path}/{part}" if current_path else part
-            folder_url = self._get_remote_url(current_path)
-            
-            # Check if the collection exists
-            response = self.session.request('PROPFIND', folder_url, headers={'Depth': '0'})
-
-            # 404 means it doesn't exist, so we need to create it.
-            if response.status_code == 404:
-                print(f"Folder '{current_path}' does not exist. Creating it...")
-                mkcol_response = self.session.request('MKCOL', folder_url)
-                
-                # 201 Created is success.
-                # 405 Method Not Allowed often means it was created by another process
-                # between our PROPFIND and MKCOL calls (a race condition), so we treat it as success.
-                if mkcol_response.status_code in (201, 405):
-                    pass
-                    # print(f"Folder '{current_path}' created successfully.")
-                else:
-                    # print(f"Failed to create folder '{current_path}': {mkcol_response.status_code} {mkcol_response.text}")
-                    # You might want to raise an exception here to stop the script
-                    raise Exception(f"Failed to create folder '{current_path}': {mkcol_response.status_code}")
-            
-            # 200 or 207 means it already exists.
-            elif response.status_code in (200, 207):
-                pass
-                # print(f"Folder '{current_path}' already exists.")
-            
-            # Handle other unexpected errors
-            else:
-                # print(f"Unexpected response ({response.status_code}) when checking folder '{current_path}'.")
-                # print(response.text)
-                raise Exception(f"Failed to check/create folder '{current_path}': {response.status_code}")
+        remote_folder = remote_folder.strip('/')
+        if not remote_folder or self.collection_cache.contains(self.collection_server, remote_folder):
+            return
+        self._make_collection(remote_folder)
+        self.collection_cache.save()
+
+
+    def _make_collection(self, remote_folder):
+        folder_url = self._get_remote_url(remote_folder)
+        response = self.transport.request('MKCOL', folder_url)
+
+        # 409 Conflict means a parent folder is missing, create it first and retry.
+        parent_folder = remote_folder.rpartition('/')[0]
+        if response.status_code == 409 and parent_folder:
+            self._make_collection(parent_folder)
+            response = self.transport.request('MKCOL', folder_url)
+
+        # 201 Created is success.
+        # 405 Method Not Allowed means it already exists, possibly created by another process.
+        if response.status_code == 201:
+            print(f"Folder '{remote_folder}' did not exist. Created it.")
+        elif response.status_code == 401:
+            raise Exception("Authentication failed (401). Check credentials.")
+        elif response.status_code != 405:
+            raise Exception(f"Failed to check/create folder '{remote_folder}': {response.status_code}")
+        self.collection_cache.add(self.collection_server, remote_folder)
 
 
     def get_remote_file_modtime(self, remote_file):
@@ -80,25 +93,12 @@ class NextcloudApiProxy:
         Retrieve the last modification time of the remote file using a PROPFIND request.
         Returns the modification timestamp (seconds since epoch) or None if the file doesn't exist.
         """
-        headers = {'Depth': '0'}
-        remote_url = self._get_remote_url(remote_file)
-        response = self.session.request('PROPFIND', remote_url, headers=headers)
-        if response.status_code in [200, 207]:
-            try:
-                root = ET.fromstring(response.content)
-                ns = {'d': 'DAV:'}
-                mod_elem = root.find('.//d:getlastmodified', ns)
-                if mod_elem is not None and mod_elem.text:
-                    remote_dt = parsedate_to_datetime(mod_elem.text)
-                    return remote_dt.timestamp()
-            except Exception as e:
-                print(f"Error parsing PROPFIND response for {remote_url}: {e}")
-                return None
-        elif response.status_code == 404:
-            return None
-        else:
-            # print(f"Unexpected PROPFIND response for {remote_url}: {response.status_code} - {response.text}")
-            return None
+        try:
+            for path, is_collection, props in self._propfind(remote_file, '0'):
+                return props['mtime']
+        except Exception as e:
+            print(f"Error reading modification time of {remote_file}: {e}")
+        return None
 
 
     def list_remote_files(self, remote_folder):
@@ -106,46 +106,117 @@ class NextcloudApiProxy:
         Lists the files in the remote folder by performing a PROPFIND with Depth 1.
         Returns a dictionary mapping filenames to their last modification timestamps.
         """
-        folder_url = self._get_remote_url(remote_folder)
-        headers = {'Depth': '1'}
-        response = self.session.request('PROPFIND', folder_url, headers=headers)
         files = {}
-        if response.status_code not in [200, 207]:
-            if response.status_code == 404:
-                return {} # Folder doesn't exist, so it's empty
-            if response.status_code == 401:
-                raise Exception("Authentication failed (401). Check credentials.")
-            raise Exception(f"Failed to list files: {response.status_code}")
-        try:
-            root = ET.fromstring(response.content)
-            ns = {'d': 'DAV:'}
-            # Each <d:response> represents either the folder itself or a file/subfolder
-            for response_elem in root.findall('d:response', ns):
-                href_elem = response_elem.find('d:href', ns)
-                if href_elem is None:
-                    continue
-                href = href_elem.text
-                # Extract the file name from the URL path
-                parsed = urllib.parse.urlparse(href)
-                path = parsed.path
-                filename = os.path.basename(path.rstrip('/'))
-                # Decode the filename to convert %20 back to spaces
-                filename = urllib.parse.unquote(filename)
-                # Skip the folder itself (empty filename)
-                if not filename:
-                    continue
-                mod_elem = response_elem.find('.//d:getlastmodified', ns)
-                if mod_elem is not None and mod_elem.text:
-                    remote_dt = parsedate_to_datetime(mod_elem.text)
-                    mod_time = remote_dt.timestamp()
-                else:
-                    mod_time = None
-                files[filename] = mod_time
-        except Exception as e:
-            print(f"Error parsing remote folder listing: {e}")
+        for path, is_collection, props in self._propfind(remote_folder, '1'):
+            # Skip the folder itself (empty path)
+            if path:
+                files[path] = props['mtime']
         return files
 
 
+    def get_collection_etags(self, remote_folder):
+        """
+        Returns the ETags of a folder and its direct subfolders with one Depth 1 PROPFIND.
+        A collection's ETag changes whenever anything below it changes.
+
+        Returns:
+            dict: Mapping of subfolder name ('' for the folder itself) to its ETag.
+        """
+        return {path: props['etag'] for path, is_collection, props in self._propfind(remote_folder, '1') if is_collection}
+
+
+    def list_remote_tree(self, remote_folder):
+        """
+        Lists every subfolder of the remote folder with a single Depth infinity PROPFIND.
+
+        Returns:
+            dict or None: Mapping of subfolder path to {'etag': str, 'files': {filename: mod_time}},
+                          or None if the server doesn't allow Depth infinity.
+        """
+        try:
+            entries = list(self._propfind(remote_folder, 'infinity'))
+        except PropfindRefusedError:
+            return None
+        tree = {}
+        for path, is_collection, props in entries:
+            if is_collection:
+                tree.setdefault(path, {'files': {}})['etag'] = props['etag']
+            else:
+                folder, _, filename = path.rpartition('/')
+                tree.setdefault(folder, {'files': {}})['files'][filename] = props['mtime']
+        return tree
+
+
+    def _propfind(self, remote_folder, depth):
+        """
+        Yields (path relative to remote_folder, is_collection, props) for each entry of a PROPFIND,
+        where props is {'mtime': float, 'etag': str, 'size': int, 'checksums': str}.
+        Only those properties are requested and the response is parsed as it streams in,
+        so memory stays flat however large the folder is. A missing folder yields nothing.
+        """
+        folder_url = self._get_remote_url(remote_folder)
+        headers = {'Depth': depth, 'Content-Type': 'application/xml; charset=utf-8'}
+        response = self.transport.request('PROPFIND', folder_url, headers=headers,
+                                          data=NEXTCLOUD_PROPFIND_BODY, stream=True)
+        try:
+            if response.status_code not in [200, 207]:
+                if response.status_code == 404:
+                    return # Folder doesn't exist, so it's empty
+                if response.status_code == 401:
+                    raise Exception("Authentication failed (401). Check credentials.")
+                if depth == 'infinity' and response.status_code in (400, 403):
+                    raise PropfindRefusedError(f"Depth infinity refused: {response.status_code}")
+                raise Exception(f"Failed to list files: {response.status_code}")
+
+            folder_path = urllib.parse.unquote(urllib.parse.urlparse(folder_url).path).rstrip('/')
+            response.raw.decode_content = True
+            root = None
+            try:
+                for event, elem in ET.iterparse(response.raw, events=('start', 'end')):
+                    if root is None:
+                        root = elem
+                    # Each <d:response> represents either the folder itself or a file/subfolder
+                    if event != 'end' or elem.tag != f'{DAV_NS}response':
+                        continue
+                    entry = self._parse_propfind_response(elem, folder_path)
+                    # Drop the parsed responses so the tree never holds more than one
+                    root.clear()
+                    if entry is not None:
+                        yield entry
+            except ET.ParseError as e:
+                print(f"Error parsing remote folder listing: {e}")
+        finally:
+            response.close()
+
+
+    def _parse_propfind_response(self, response_elem, folder_path):
+        href_elem = response_elem.find(f'{DAV_NS}href')
+        if href_elem is None or not href_elem.text:
+            return None
+        # Decode the path to convert %20 back to spaces
+        path = urllib.parse.unquote(urllib.parse.urlparse(href_elem.text).path)
+        if not path.startswith(folder_path):
+            return None
+        relative_path = path[len(folder_path):].strip('/')
+        is_collection = response_elem.find(f'.//{DAV_NS}resourcetype/{DAV_NS}collection') is not None or path.endswith('/')
+
+        mod_time = None
+        mod_text = response_elem.findtext(f'.//{DAV_NS}getlastmodified')
+        if mod_text:
+            try:
+                mod_time = parsedate_to_datetime(mod_text).timestamp()
+            except (TypeError, ValueError) as e:
+                print(f"Error parsing modification time of {relative_path}: {e}")
+        size_text = response_elem.findtext(f'.//{DAV_NS}getcontentlength')
+        props = {
+            'mtime': mod_time,
+            'etag': response_elem.findtext(f'.//{DAV_NS}getetag'),
+            'size': int(size_text) if size_text and size_text.isdigit() else None,
+            'checksums': response_elem.findtext(f'.//{OC_NS}checksums/{OC_NS}checksum') or None,
+        }
+        return relative_path, is_collection, props
+
+
     def upload_file(self, file_contents, remote_file):
         """
         Upload file contents to Nextcloud.
@@ -157,7 +228,13 @@ class NextcloudApiProxy:
         remote_url = self._get_remote_url(remote_file)
         
         try:
-            response = self.session.put(remote_url, data=file_contents)
+            response = self.transport.put(remote_url, data=file_contents)
+            remote_folder = remote_file.strip('/').rpartition('/')[0]
+            if response.status_code == 409 and remote_folder:
+                # The folder was removed since it was cached as existing, create it again
+                self.collection_cache.discard(self.collection_server, remote_folder)
+                self.ensure_remote_folder(remote_folder)
+                response = self.transport.put(remote_url, data=file_contents)
             # if response.status_code in [200, 201, 204]:
             #     print(f"Uploaded successfully to {remote_url}")
             if response.status_code not in [200, 201, 204]:
@@ -176,7 +253,7 @@ class NextcloudApiProxy:
         """
         remote_url = self._get_remote_url(remote_file)
         try:
-            response = self.session.get(remote_url)
+            response = self.transport.get(remote_url)
             if response.status_code == 200:
                 return response.content
             elif response.status_code == 404:
@@ -197,7 +274,7 @@ class NextcloudApiProxy:
         """
         remote_url = self._get_remote_url(remote_file)
         try:
-            response = self.session.delete(remote_url)
+            response = self.transport.delete(remote_url)
             if response.status_code in [200, 204]:
                 # print(f"Deleted {remote_file}")
                 pass
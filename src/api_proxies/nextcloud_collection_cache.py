@@ -0,0 +1,65 @@
+import threading
+
+from api_proxies.constants import NEXTCLOUD_COLLECTION_CACHE_FILE_NAME
+from data.app_data import AppData
+
+
+class NextcloudCollectionCache:
+    """
+    Remote folders already known to exist, so ensuring them again costs no requests.
+    Kept per server (the user's WebDAV root URL) and stored as {server: [folder, ...]}.
+    Without a file name the cache only lives in memory.
+    """
+    def __init__(self, file_name=None, entries=None):
+        self.file_name = file_name
+        self.entries = {server: set(folders) for server, folders in (entries or {}).items()}
+        self._lock = threading.Lock()
+
+
+    @classmethod
+    def load(cls):
+        return cls(NEXTCLOUD_COLLECTION_CACHE_FILE_NAME,
+                   AppData.read_json_from_file(NEXTCLOUD_COLLECTION_CACHE_FILE_NAME, dict))
+
+
+    def save(self):
+        if self.file_name is None:
+            return
+        with self._lock:
+            entries = {server: sorted(folders) for server, folders in self.entries.items()}
+            AppData.save_json_to_file(self.file_name, entries, dict)
+
+
+    def contains(self, server, folder):
+        with self._lock:
+            return folder in self.entries.get(server, ())
+
+
+    def add(self, server, folder):
+        """Remember folder and, since they must exist too, all of its parents."""
+        parts = folder.split('/')
+        with self._lock:
+            folders = self.entries.setdefault(server, set())
+            for i in range(1, len(parts) + 1):
+                folders.add('/'.join(parts[:i]))
+
+
+    def discard(self, server, folder):
+        """Forget folder and everything below it, e.g. after it was deleted remotely."""
+        with self._lock:
+            folders = self.entries.get(server, set())
+            stale = [f for f in folders if f == folder or f.startswith(f"{folder}/")]
+            for f in stale:
+                folders.discard(f)
+
+
+_collection_cache = None
+_collection_cache_lock = threading.Lock()
+
+
+def get_collection_cache():
+    global _collection_cache
+    with _collection_cache_lock:
+        if _collection_cache is None:
+            _collection_cache = NextcloudCollectionCache.load()
+        return _collection_cache
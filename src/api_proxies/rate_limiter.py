@@ -0,0 +1,73 @@
+import threading
+import time
+import urllib.parse
+
+from api_proxies.constants import DEFAULT_RATE_LIMITS
+
+
+class TokenBucket:
+    def __init__(self, rate, capacity):
+        """
+        Args:
+            rate (float): Tokens added per second. A rate of 0 or less disables limiting.
+            capacity (int): Maximum number of tokens that can be accumulated (burst size).
+        """
+        self.rate = float(rate)
+        self.capacity = max(1, int(capacity))
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+
+    def acquire(self, tokens=1):
+        """
+        Take tokens from the bucket, sleeping until they are available.
+        Tokens are reserved under the lock so concurrent callers queue up fairly
+        instead of all waking up at the same moment.
+        """
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        if wait > 0:
+            time.sleep(wait)
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def configure_rate_limits(limits=None):
+    """
+    Replace the per-host token buckets.
+
+    Args:
+        limits (dict, optional): Mapping of host to (rate, capacity). Entries are merged
+                                 over DEFAULT_RATE_LIMITS.
+    """
+    merged = dict(DEFAULT_RATE_LIMITS)
+    if limits:
+        merged.update({host: tuple(value) for host, value in limits.items()})
+    with _buckets_lock:
+        _buckets.clear()
+        for host, (rate, capacity) in merged.items():
+            _buckets[host] = TokenBucket(rate, capacity)
+
+
+def get_rate_limiter(host):
+    with _buckets_lock:
+        if not _buckets:
+            for default_host, (rate, capacity) in DEFAULT_RATE_LIMITS.items():
+                _buckets[default_host] = TokenBucket(rate, capacity)
+        return _buckets.get(host)
+
+
+def acquire_for_url(url):
+    host = urllib.parse.urlparse(url).hostname
+    bucket = get_rate_limiter(host)
+    if bucket is not None:
+        bucket.acquire()
@@ -0,0 +1,142 @@
+import os
+import sqlite3
+import threading
+import time
+
+
+class ResponseCache:
+    """
+    Disk-backed HTTP response cache stored in SQLite.
+
+    Entries carry the validators (ETag / Last-Modified) returned by the server so stale
+    entries can be revalidated with a conditional request instead of refetched. The
+    number of entries is capped; the least recently used entries are evicted first.
+    Access times of lookups are kept in memory and written in one batch, so reading
+    the cache doesn't commit a write per lookup.
+    """
+    def __init__(self, path, ttls=None, default_ttl=24 * 60 * 60, max_entries=50000, access_flush_size=1000):
+        """
+        Args:
+            path (str): Location of the SQLite database file.
+            ttls (dict, optional): Mapping of endpoint name to time-to-live in seconds.
+            default_ttl (int): Time-to-live for endpoints not present in ttls.
+            max_entries (int): Maximum number of cached responses to keep.
+            access_flush_size (int): Number of pending access times that triggers a write.
+        """
+        self.path = path
+        self.ttls = ttls or {}
+        self.default_ttl = default_ttl
+        self.max_entries = max_entries
+        self.access_flush_size = access_flush_size
+        # key -> last access time not yet written to the database
+        self._pending_access = {}
+        self._lock = threading.Lock()
+
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS responses ('
+                ' key TEXT PRIMARY KEY,'
+                ' endpoint TEXT NOT NULL,'
+                ' status INTEGER NOT NULL,'
+                ' body TEXT,'
+                ' etag TEXT,'
+                ' last_modified TEXT,'
+                ' expires_at REAL NOT NULL,'
+                ' last_access REAL NOT NULL)'
+            )
+            self._conn.execute('CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)')
+            self._count = self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
+
+
+    def get(self, key):
+        """
+        Look up a cached response, fresh or stale.
+
+        Returns:
+            dict or None: The cached entry with an extra 'fresh' flag, or None if not cached.
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT status, body, etag, last_modified, expires_at FROM responses WHERE key = ?',
+                (key,)).fetchone()
+            if row is None:
+                return None
+            self._pending_access[key] = now
+            if len(self._pending_access) >= self.access_flush_size:
+                with self._conn:
+                    self._flush_access()
+        status, body, etag, last_modified, expires_at = row
+        return {
+            'status': status,
+            'body': body,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fresh': expires_at > now,
+        }
+
+
+    def put(self, key, endpoint, status, body, etag=None, last_modified=None):
+        now = time.time()
+        expires_at = now + self._get_ttl(endpoint)
+        with self._lock, self._conn:
+            exists = self._conn.execute('SELECT 1 FROM responses WHERE key = ?', (key,)).fetchone()
+            if exists is None:
+                self._count += 1
+            # Eviction below has to see the recent lookups
+            self._flush_access()
+            self._conn.execute(
+                'INSERT OR REPLACE INTO responses'
+                ' (key, endpoint, status, body, etag, last_modified, expires_at, last_access)'
+                ' VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (key, endpoint, status, body, etag, last_modified, expires_at, now))
+            self._evict()
+
+
+    def refresh(self, key, endpoint):
+        """
+        Extend the lifetime of an entry after the server confirmed it is unchanged (304).
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._pending_access.pop(key, None)
+            self._conn.execute('UPDATE responses SET expires_at = ?, last_access = ? WHERE key = ?',
+                               (now + self._get_ttl(endpoint), now, key))
+
+
+    def flush(self):
+        """Write the access times of recent lookups."""
+        with self._lock, self._conn:
+            self._flush_access()
+
+
+    def close(self):
+        with self._lock:
+            with self._conn:
+                self._flush_access()
+            self._conn.close()
+
+
+    def _get_ttl(self, endpoint):
+        return self.ttls.get(endpoint, self.default_ttl)
+
+
+    def _flush_access(self):
+        if not self._pending_access:
+            return
+        self._conn.executemany('UPDATE responses SET last_access = ? WHERE key = ?',
+                               [(accessed, key) for key, accessed in self._pending_access.items()])
+        self._pending_access = {}
+
+
+    def _evict(self):
+        overflow = self._count - self.max_entries
+        if overflow > 0:
+            cursor = self._conn.execute(
+                'DELETE FROM responses WHERE key IN'
+                ' (SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)',
+                (overflow,))
+            self._count -= cursor.rowcount
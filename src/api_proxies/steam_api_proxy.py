@@ -1,11 +1,14 @@
 import argparse
+import concurrent.futures
 import pprint
-import requests
+
+from api_proxies.constants import DEFAULT_MAX_WORKERS
+from api_proxies.http_transport import get_transport
 from steam.steam_id import SteamId
 
 def get_owned_games(api_key, steam_id: SteamId):
     url = f"http://api.steampowered.com/IPlayerService/GetOwnedGames/v0001/?key={api_key}&steamid={steam_id.get_steamid64()}&include_appinfo=true"
-    owned_games = requests.get(url)
+    owned_games = get_transport().get(url)
     response_data = owned_games.json().get('response', {})
     if 'games' in response_data:
         return response_data['games']
@@ -14,12 +17,17 @@ def get_owned_games(api_key, steam_id: SteamId):
         return []
 
 def has_600x900_grid_image(app_id):
-    # Steam API endpoint for getting app details
+    """
+    Probe the Steam CDN for the official vertical grid image of an app.
+    Only the headers are requested, the image itself is never downloaded.
+
+    Returns:
+        bool or None: Whether the image exists, or None if the probe failed.
+    """
     url = f"https://steamcdn-a.akamaihd.net/steam/apps/{app_id}/library_600x900.jpg"
 
     try:
-        # Send a GET request to the Steam API
-        response = requests.get(url)
+        response = get_transport().head(url, allow_redirects=True)
 
         # Check if the request was successful and the app data is available
         if response.status_code == 200:
@@ -27,17 +35,30 @@ def has_600x900_grid_image(app_id):
               
     except Exception as e:
         print(f"An error occurred fetching steam library image from steamcdn-a: {e}")
-        return False
+        return None
     return False
 
+
+def probe_600x900_grid_images(app_ids, max_workers=DEFAULT_MAX_WORKERS):
+    """
+    Run has_600x900_grid_image for many apps in parallel.
+
+    Returns:
+        dict: Mapping of app id to True, False or None (probe failed).
+    """
+    app_ids = list(app_ids)
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(has_600x900_grid_image, app_ids)
+        return dict(zip(app_ids, results))
+
 def get_games_without_600x900_grid_image(api_key, steam_id: SteamId):
     owned_games_json = get_owned_games(api_key, steam_id)
     games_without_600x900_image = set()
 
-    for game in owned_games_json:
-        has_grid_image = has_600x900_grid_image(game['appid'])
+    probes = probe_600x900_grid_images(game['appid'] for game in owned_games_json)
+    for app_id, has_grid_image in probes.items():
         if not has_grid_image:
-            games_without_600x900_image.add(game['appid'])
+            games_without_600x900_image.add(app_id)
     
     return games_without_600x900_image
 
@@ -1,15 +1,83 @@
 import argparse
+import json
 import requests
+import threading
+
+from api_proxies.constants import (
+    STEAMGRIDDB_BATCH_SIZE,
+    STEAMGRIDDB_CACHE_FILE_NAME,
+    STEAMGRIDDB_CACHE_MAX_ENTRIES,
+    STEAMGRIDDB_CACHE_TTLS,
+)
+from api_proxies.http_transport import get_transport
+from api_proxies.response_cache import ResponseCache
+from data.app_data import AppData
+
+
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    global _response_cache
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(AppData.get_file_path(STEAMGRIDDB_CACHE_FILE_NAME),
+                                            ttls=STEAMGRIDDB_CACHE_TTLS,
+                                            max_entries=STEAMGRIDDB_CACHE_MAX_ENTRIES)
+        return _response_cache
+
+
+def _get_json(api_key, url, endpoint):
+    """
+    GET a SteamGridDB endpoint through the shared response cache.
+    Fresh entries are served from disk; stale entries are revalidated with
+    If-None-Match / If-Modified-Since so an unchanged response costs a 304.
+
+    A 404 is returned as a normal (404, None) result since it means SteamGridDB has no
+    such game; any other error status raises so callers don't mistake an outage for a miss.
+
+    Returns:
+        tuple: (status_code, parsed JSON or None)
+    """
+    cache = get_response_cache()
+    cached = cache.get(url)
+    if cached is not None and cached['fresh']:
+        return cached['status'], json.loads(cached['body'])
 
-def get_gameid_from_steam_appid(api_key, steam_app_id):
-    url = f"https://www.steamgriddb.com/api/v2/games/steam/{steam_app_id}"
     headers = {
         "Authorization": f"Bearer {api_key}"
     }
-    response = requests.get(url, headers=headers)
-    
-    if response.status_code == 200:
-        data = response.json()  # Parse JSON response
+    if cached is not None:
+        if cached['etag']:
+            headers['If-None-Match'] = cached['etag']
+        if cached['last_modified']:
+            headers['If-Modified-Since'] = cached['last_modified']
+
+    response = get_transport().get(url, headers=headers)
+
+    if response.status_code == 304 and cached is not None:
+        cache.refresh(url, endpoint)
+        return cached['status'], json.loads(cached['body'])
+    if response.status_code == 404:
+        return response.status_code, None
+    response.raise_for_status()
+    if response.status_code != 200:
+        return response.status_code, None
+
+    data = response.json()
+    if data.get('success', False):
+        cache.put(url, endpoint, response.status_code, response.text,
+                  etag=response.headers.get('ETag'),
+                  last_modified=response.headers.get('Last-Modified'))
+    return response.status_code, data
+
+
+def get_gameid_from_steam_appid(api_key, steam_app_id):
+    url = f"https://www.steamgriddb.com/api/v2/games/steam/{steam_app_id}"
+    status_code, data = _get_json(api_key, url, 'games')
+
+    if status_code == 200:
         if data.get('success', False):  # Check if 'success' key is present in the response
             game_id = data.get('data', {}).get('id', None)  # Access game ID safely
             if game_id is not None:
@@ -22,29 +90,98 @@ def get_gameid_from_steam_appid(api_key, steam_app_id):
             # print(f"Failed to fetch images from SteamGridDB for app ID {steam_app_id}.")
     else:
         pass
-        # print(f"Failed to fetch images from SteamGridDB for app ID {steam_app_id}. Status code: {response.status_code}")
+        # print(f"Failed to fetch images from SteamGridDB for app ID {steam_app_id}. Status code: {status_code}")
     return None
     
 def get_grid_url_from_gameid(api_key, game_id, dimensions='600x900'):
     url = f"https://www.steamgriddb.com/api/v2/grids/game/{game_id}?dimensions={dimensions}"
-    return get_url_from_data(api_key, url, game_id)
+    return get_url_from_data(api_key, url, game_id, endpoint='grids')
 
 def get_hero_url_from_gameid(api_key, game_id):
     url = f"https://www.steamgriddb.com/api/v2/heroes/game/{game_id}"
-    return get_url_from_data(api_key, url, game_id)
+    return get_url_from_data(api_key, url, game_id, endpoint='heroes')
 
 def get_logo_url_from_gameid(api_key, game_id):
     url = f"https://www.steamgriddb.com/api/v2/logos/game/{game_id}"
-    return get_url_from_data(api_key, url, game_id)
+    return get_url_from_data(api_key, url, game_id, endpoint='logos')
 
-def get_url_from_data(api_key, url, game_id):
-    headers = {
-        "Authorization": f"Bearer {api_key}"
-    }
-    response = requests.get(url, headers=headers)
-    
-    if response.status_code == 200:
-        data = response.json()  # Parse JSON response
+def get_grid_urls_from_steam_appids(api_key, steam_app_ids, dimensions='600x900'):
+    return get_urls_from_steam_appids(api_key, 'grids', steam_app_ids, query=f"?dimensions={dimensions}")
+
+def get_hero_urls_from_steam_appids(api_key, steam_app_ids):
+    return get_urls_from_steam_appids(api_key, 'heroes', steam_app_ids)
+
+def get_logo_urls_from_steam_appids(api_key, steam_app_ids):
+    return get_urls_from_steam_appids(api_key, 'logos', steam_app_ids)
+
+def get_urls_from_steam_appids(api_key, endpoint, steam_app_ids, query=''):
+    """
+    Look up the first image of many Steam apps at once through SteamGridDB's platform
+    endpoints, which accept a comma separated list of Steam appids and skip the gameid hop.
+    Each app's result is cached under its single-appid URL, so cached apps are not requested.
+
+    Args:
+        api_key (str): SteamGridDB API key.
+        endpoint (str): 'grids', 'heroes' or 'logos'.
+        steam_app_ids (iterable): Steam appids to look up.
+        query (str): Query string appended to every request, e.g. '?dimensions=600x900'.
+
+    Returns:
+        dict: Mapping of appid to image URL, or None when SteamGridDB has no image.
+              Appids whose lookup failed are left out.
+    """
+    cache = get_response_cache()
+    urls = {}
+    pending = []
+    for steam_app_id in steam_app_ids:
+        cached = cache.get(_get_platform_url(endpoint, steam_app_id, query))
+        if cached is not None and cached['fresh']:
+            urls[steam_app_id] = _get_first_url(json.loads(cached['body']))
+        else:
+            pending.append(steam_app_id)
+
+    for i in range(0, len(pending), STEAMGRIDDB_BATCH_SIZE):
+        batch = pending[i:i + STEAMGRIDDB_BATCH_SIZE]
+        url = _get_platform_url(endpoint, ','.join(str(app_id) for app_id in batch), query)
+        headers = {
+            "Authorization": f"Bearer {api_key}"
+        }
+        try:
+            response = get_transport().get(url, headers=headers)
+            if response.status_code == 404:
+                urls.update({app_id: None for app_id in batch})
+                continue
+            response.raise_for_status()
+            data = response.json()
+        except requests.RequestException as e:
+            # Keep the other batches, these appids are looked up again next run
+            print(f"Error fetching {endpoint} from SteamGridDB for {len(batch)} apps: {e}")
+            continue
+
+        # A single id gets the plain response, several ids get one result object per id
+        results = [data] if len(batch) == 1 else data.get('data', [])
+        for steam_app_id, result in zip(batch, results):
+            if result.get('success', False):
+                body = {'success': True, 'data': result.get('data', [])}
+                cache.put(_get_platform_url(endpoint, steam_app_id, query), endpoint, 200, json.dumps(body))
+                urls[steam_app_id] = _get_first_url(body)
+            elif result.get('status') == 404:
+                urls[steam_app_id] = None
+    return urls
+
+def _get_platform_url(endpoint, steam_app_ids, query=''):
+    return f"https://www.steamgriddb.com/api/v2/{endpoint}/steam/{steam_app_ids}{query}"
+
+def _get_first_url(data):
+    images = data.get('data') or []
+    if images:
+        return images[0].get('url', None)
+    return None
+
+def get_url_from_data(api_key, url, game_id, endpoint='grids'):
+    status_code, data = _get_json(api_key, url, endpoint)
+
+    if status_code == 200:
         if data.get('success', False):  # Check if 'success' key is present in the response
             try:
                 response_url = data.get('data', [])[0].get('url', None)  # Access grid URL safely
@@ -61,7 +198,7 @@ def get_url_from_data(api_key, url, game_id):
             # print(f"Failed to fetch images from SteamGridDB for app ID {game_id}.")
     else:
         pass
-        # print(f"Failed to fetch images from SteamGridDB for app ID {game_id}. Status code: {response.status_code}")
+        # print(f"Failed to fetch images from SteamGridDB for app ID {game_id}. Status code: {status_code}")
     return None
 
 if __name__ == "__main__":
@@ -11,9 +11,7 @@ from cloud.nextcloud_manager import NextcloudManager
 from steam.steam_image_handler import extract_appid_and_postfix
 from steam.steam_directory_finder import get_grid_path
 from steam.steam_id import SteamId
-
-STEAM_GRID_SYNC_DIR = "SteamGridSync"
-NON_STEAM_DIR = "SteamShortcutGridSync"
+from cloud.constants import STEAM_GRID_SYNC_DIR, NON_STEAM_DIR
 
 def cleanup_local_duplicates(local_dir, dry_run=False):
     print(f"\nScanning local folder: {local_dir}")
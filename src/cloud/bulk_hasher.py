@@ -0,0 +1,59 @@
+import concurrent.futures
+import hashlib
+import mmap
+import os
+
+from cloud.constants import BULK_HASH_MIN_FILES, DROPBOX_CONTENT_HASH, DROPBOX_HASH_BLOCK_SIZE
+
+
+def hash_file(file_path, algorithms=(DROPBOX_CONTENT_HASH,)):
+    """
+    Compute several digests of a file in a single pass over a memory map of it.
+    DROPBOX_CONTENT_HASH gives the Dropbox block-hash format, any other name is
+    passed to hashlib.new().
+
+    Returns:
+        dict or None: {algorithm: hex digest}, or None if the file does not exist.
+    """
+    block_hash = hashlib.sha256() if DROPBOX_CONTENT_HASH in algorithms else None
+    digests = {name: hashlib.new(name) for name in algorithms if name != DROPBOX_CONTENT_HASH}
+    try:
+        with open(file_path, 'rb') as f:
+            # Empty files can't be mapped, and have no blocks to hash anyway
+            if os.fstat(f.fileno()).st_size > 0:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+                    for offset in range(0, len(view), DROPBOX_HASH_BLOCK_SIZE):
+                        block = view[offset:offset + DROPBOX_HASH_BLOCK_SIZE]
+                        if block_hash is not None:
+                            block_hash.update(hashlib.sha256(block).digest())
+                        for digest in digests.values():
+                            digest.update(block)
+                        block.release()
+    except FileNotFoundError:
+        print(f"Error computing hash, File not found: {file_path}")
+        return None
+    results = {name: digest.hexdigest() for name, digest in digests.items()}
+    if block_hash is not None:
+        results[DROPBOX_CONTENT_HASH] = block_hash.hexdigest()
+    return results
+
+
+def hash_files(file_paths, algorithms=(DROPBOX_CONTENT_HASH,), max_workers=None):
+    """
+    Hash many files, spreading them across worker processes when there are
+    enough of them to be worth it.
+
+    Returns:
+        dict: {file_path: {algorithm: hex digest}}, missing files map to None.
+    """
+    file_paths = list(file_paths)
+    if len(file_paths) < BULK_HASH_MIN_FILES:
+        return {file_path: hash_file(file_path, algorithms) for file_path in file_paths}
+
+    max_workers = max_workers or os.cpu_count() or 1
+    # Hand out files in chunks so the per-task IPC doesn't dominate for small images
+    chunksize = max(1, len(file_paths) // (4 * max_workers))
+    with concurrent.futures.ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = executor.map(hash_file, file_paths, [tuple(algorithms)] * len(file_paths), chunksize=chunksize)
+        return dict(zip(file_paths, results))
+
@@ -1,3 +1,33 @@
 DROPBOX_GRID_DIRECTORY = '/{user_id}/grid'
 DROPBOX_GRID_NON_STEAM_DIRECTORY = '/{user_id}/grid-non-steam'
 DROPBOX_MANIFEST_PATH = '/{user_id}/manifest.json'
+
+STEAM_GRID_SYNC_DIR = 'SteamGridSync'
+NON_STEAM_DIR = 'SteamShortcutGridSync'
+
+# Dropbox content hashes are a SHA-256 over the SHA-256 of each 4MB block
+DROPBOX_HASH_BLOCK_SIZE = 4 * 1024 * 1024
+DROPBOX_CONTENT_HASH = 'dropbox'
+# Fewer files than this are hashed in-process; starting workers would cost more
+BULK_HASH_MIN_FILES = 32
+
+DROPBOX_TOKEN_URL = 'https://api.dropbox.com/oauth2/token'
+# Refresh cached access tokens this many seconds before Dropbox expires them
+DROPBOX_TOKEN_EXPIRY_MARGIN = 5 * 60
+
+DROPBOX_LISTING_FILE_NAME = 'dropbox_listing_{user_id}.json'
+# Seconds a watch longpoll waits for changes. Dropbox adds up to 90s of jitter on top.
+DROPBOX_LONGPOLL_TIMEOUT = 30
+
+# Upload session chunk size; files are never read into memory in one piece
+DROPBOX_UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+# Most upload sessions Dropbox commits in one finish_batch call
+DROPBOX_UPLOAD_BATCH_SIZE = 1000
+DROPBOX_DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+MANIFEST_FORMAT_VERSION = 2
+DROPBOX_MANIFEST_JOURNAL_DIRECTORY = '/{user_id}/manifest-journal'
+# Journal deltas allowed to pile up before the remote manifest is rewritten in full
+DROPBOX_MANIFEST_MAX_JOURNAL = 20
+
+NEXTCLOUD_FOLDER_CACHE_FILE_NAME = 'nextcloud_folders_{user_id}.json'
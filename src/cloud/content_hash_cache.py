@@ -0,0 +1,91 @@
+import os
+import threading
+
+from data.app_data import AppData
+
+
+class ContentHashCache:
+    """
+    Content hashes of local files, so an unchanged file is never read twice.
+    A hash is only returned while the file's stat signature (size, mtime_ns)
+    still matches the one it was computed for. The inode is left out since os.scandir
+    reports it as 0 on Windows while os.stat doesn't, so signatures built from either
+    always agree. Entries are stored as {path: [size, mtime_ns, hash]}.
+    """
+    FILE_NAME = 'content_hashes.json'
+
+    def __init__(self, entries=None):
+        self.entries = entries if entries is not None else {}
+        self._lock = threading.Lock()
+
+
+    @classmethod
+    def load(cls):
+        return cls(AppData.read_json_from_file(cls.FILE_NAME, dict))
+
+
+    def save(self):
+        with self._lock:
+            AppData.save_json_to_file(self.FILE_NAME, self.entries, dict)
+
+
+    def get(self, file_path, signature=None):
+        """
+        Args:
+            signature (tuple, optional): The file's current (size, mtime_ns), stat'ed if not given.
+
+        Returns:
+            str or None: The cached hash, or None if unknown or the file has changed.
+        """
+        with self._lock:
+            entry = self.entries.get(file_path)
+        if entry is None:
+            return None
+        signature = signature or get_stat_signature(file_path)
+        if signature is None or tuple(entry[:-1]) != tuple(signature):
+            return None
+        return entry[-1]
+
+
+    def set(self, file_path, file_hash, signature=None):
+        signature = signature or get_stat_signature(file_path)
+        if signature is None or file_hash is None:
+            return
+        with self._lock:
+            self.entries[file_path] = [*signature, file_hash]
+
+
+    def get_or_compute(self, file_path, compute, signature=None):
+        """
+        Returns the cached hash of file_path, calling compute(file_path) on a miss.
+        """
+        signature = signature or get_stat_signature(file_path)
+        file_hash = self.get(file_path, signature)
+        if file_hash is None:
+            file_hash = compute(file_path)
+            self.set(file_path, file_hash, signature)
+        return file_hash
+
+
+    def retain(self, folder, file_paths):
+        """Forget files in folder that are not in file_paths."""
+        folder = os.path.normpath(folder)
+        file_paths = set(file_paths)
+        with self._lock:
+            stale = [path for path in self.entries
+                     if os.path.normpath(os.path.dirname(path)) == folder and path not in file_paths]
+            for path in stale:
+                del self.entries[path]
+
+
+def get_stat_signature(file_path):
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return get_signature(stat.st_size, stat.st_mtime_ns)
+
+
+def get_signature(size, mtime_ns):
+    """The signature of a file already stat'ed elsewhere, e.g. a GridFile."""
+    return (size, mtime_ns)
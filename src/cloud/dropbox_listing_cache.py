@@ -0,0 +1,50 @@
+import threading
+
+from cloud.constants import DROPBOX_LISTING_FILE_NAME
+from data.app_data import AppData
+from steam.steam_id import SteamId
+
+
+class DropboxListingCache:
+    """
+    The last listing of each Dropbox folder and the list_folder cursor it was read at,
+    so later listings only fetch what changed since. Kept per Steam user and stored as
+    {folder_path: {'cursor': str, 'files': {name: content_hash}}}.
+    """
+    def __init__(self, file_name, entries=None):
+        self.file_name = file_name
+        self.entries = entries if entries is not None else {}
+        self._lock = threading.Lock()
+
+
+    @classmethod
+    def load(cls, steam_id: SteamId):
+        file_name = DROPBOX_LISTING_FILE_NAME.format(user_id=steam_id.get_steamid())
+        return cls(file_name, AppData.read_json_from_file(file_name, dict))
+
+
+    def save(self):
+        with self._lock:
+            AppData.save_json_to_file(self.file_name, self.entries, dict)
+
+
+    def get(self, folder_path):
+        """
+        Returns:
+            tuple: (cursor, {name: content_hash}), or (None, {}) if the folder was never listed.
+        """
+        with self._lock:
+            entry = self.entries.get(folder_path)
+            if entry is None:
+                return None, {}
+            return entry['cursor'], dict(entry['files'])
+
+
+    def get_cursor(self, folder_path):
+        return self.get(folder_path)[0]
+
+
+    def set(self, folder_path, cursor, files):
+        with self._lock:
+            self.entries[folder_path] = {'cursor': cursor, 'files': dict(files)}
+
@@ -1,66 +1,99 @@
 import concurrent.futures
 import dropbox
 import hashlib
-import json
 import os
 import requests
+import shutil
+import tempfile
+import threading
 import time
+import zipfile
 
 
 from dropbox.files import WriteMode
 from dropbox.exceptions import AuthError
+from dropbox.files import CommitInfo, ListFolderContinueError, UploadSessionCursor, UploadSessionFinishArg
+from api_proxies.constants import DEFAULT_MAX_WORKERS
 from cloud.constants import (
     DROPBOX_GRID_DIRECTORY,
+    DROPBOX_CONTENT_HASH,
+    DROPBOX_DOWNLOAD_CHUNK_SIZE,
     DROPBOX_GRID_NON_STEAM_DIRECTORY,
+    DROPBOX_LONGPOLL_TIMEOUT,
+    DROPBOX_MANIFEST_JOURNAL_DIRECTORY,
+    DROPBOX_MANIFEST_MAX_JOURNAL,
     DROPBOX_MANIFEST_PATH,
+    DROPBOX_UPLOAD_BATCH_SIZE,
+    DROPBOX_UPLOAD_CHUNK_SIZE,
 )
+from cloud.bulk_hasher import hash_file, hash_files
+from cloud.content_hash_cache import ContentHashCache, get_signature
+from cloud.dropbox_listing_cache import DropboxListingCache
+from cloud.dropbox_session import DropboxSession
+from cloud import sync_manifest
+from steam.grid_directory_index import IN_PROGRESS_SUFFIX, GridDirectoryIndex
 from steam.steam_id import SteamId
 
 
 class DropboxManager:
-    def __init__(self, app_key, app_secret, refresh_token, steam_id: SteamId, manifest):
-        self.app_key = app_key
-        self.app_secret = app_secret
-        self.refresh_token = refresh_token
+    def __init__(self, app_key, app_secret, refresh_token, steam_id: SteamId, manifest, hash_cache=None, session=None):
+        self.session = session or DropboxSession(app_key, app_secret, refresh_token)
 
         self.dropbox_folder_path = DROPBOX_GRID_DIRECTORY.format(user_id=steam_id.get_steamid())
         self.dropbox_folder_path_non_steam = DROPBOX_GRID_NON_STEAM_DIRECTORY.format(user_id=steam_id.get_steamid())
         self.dropbox_manifest_path = DROPBOX_MANIFEST_PATH.format(user_id=steam_id.get_steamid())
+        self.dropbox_manifest_journal_path = DROPBOX_MANIFEST_JOURNAL_DIRECTORY.format(user_id=steam_id.get_steamid())
+        # Journal deltas not yet folded into the remote manifest file
+        self.manifest_journal = []
 
         self.local_manifest = manifest
+        self.hash_cache = hash_cache if hash_cache is not None else ContentHashCache.load()
+        self.listing_cache = DropboxListingCache.load(steam_id)
+        # Serializes the folder watchers, which all update the manifests and the listing cache
+        self._watch_lock = threading.Lock()
+        # Fetched once; both sync directions compare against this copy
         self.remote_manifest = self._download_manifest()
 
 
-    def download_newer_files(self, local_folder, non_steam_games={}, progress=None, task_id=None):
-        access_token = self._get_access_token()
-        if not access_token:
+    def download_newer_files(self, local_folder, non_steam_games={}, progress=None, task_id=None, grid_index=None):
+        dbx = self.session.get_client()
+        if not dbx:
             print("Dropbox access token not found. Please authenticate first.")
             return
         
         if not os.path.exists(local_folder):
             os.makedirs(local_folder)
 
-        self.update_local_manifest_from_local_files(local_folder, non_steam_games)
+        grid_index = grid_index or GridDirectoryIndex(local_folder)
+        is_first_restore = not grid_index.files()
+        self.update_local_manifest_from_local_files(local_folder, non_steam_games, grid_index)
 
         # Rekey the non-Steam games dictionary to use the name as the key
         non_steam_games = {self._hash_game_name(game['AppName']): game for game in non_steam_games.values()}
 
-        self._download_newer_files_for_category(access_token, local_folder, self.dropbox_folder_path,           non_steam_games, is_steam=True, progress=progress, task_id=task_id)
-        self._download_newer_files_for_category(access_token, local_folder, self.dropbox_folder_path_non_steam, non_steam_games, is_steam=False, progress=progress, task_id=task_id)
+        if is_first_restore:
+            # Fetch each folder as a single zip; anything it misses is picked up file by file below
+            self._restore_category_from_zip(dbx, local_folder, self.dropbox_folder_path,           non_steam_games, is_steam=True,  grid_index=grid_index)
+            self._restore_category_from_zip(dbx, local_folder, self.dropbox_folder_path_non_steam, non_steam_games, is_steam=False, grid_index=grid_index)
 
+        self._download_newer_files_for_category(dbx, local_folder, self.dropbox_folder_path,           non_steam_games, is_steam=True, progress=progress, task_id=task_id, grid_index=grid_index)
+        self._download_newer_files_for_category(dbx, local_folder, self.dropbox_folder_path_non_steam, non_steam_games, is_steam=False, progress=progress, task_id=task_id, grid_index=grid_index)
+        self.hash_cache.save()
 
-    def upload_newer_files(self, local_folder, non_steam_games={}, progress=None, task_id=None):
-        access_token = self._get_access_token()
-        if not access_token:
+
+    def upload_newer_files(self, local_folder, non_steam_games={}, progress=None, task_id=None, grid_index=None):
+        dbx = self.session.get_client()
+        if not dbx:
             print("Dropbox access token not found. Please authenticate first.")
             return
         
         steam_app_files = []
         non_steam_app_files = []
 
-        self.update_local_manifest_from_local_files(local_folder, non_steam_games)
+        grid_index = grid_index or GridDirectoryIndex(local_folder)
+        self.update_local_manifest_from_local_files(local_folder, non_steam_games, grid_index)
 
-        files = os.listdir(local_folder)
+        files = [grid_file.filename for grid_file in grid_index.files()]
         for file in files:
             game_id, postfix = self._extract_gameid_from_filename(file)
             if game_id in non_steam_games:
@@ -68,8 +101,49 @@ class DropboxManager:
             elif len(game_id) < 10: # Skip stale images to old shortcuts
                 steam_app_files.append(file)
 
-        self._upload_newer_files(access_token, local_folder, steam_app_files, self.dropbox_folder_path, progress=progress, task_id=task_id)
-        self._upload_newer_files(access_token, local_folder, non_steam_app_files, self.dropbox_folder_path_non_steam, non_steam_games, progress=progress, task_id=task_id)
+        self._upload_newer_files(dbx, local_folder, steam_app_files, self.dropbox_folder_path, progress=progress, task_id=task_id, grid_index=grid_index)
+        self._upload_newer_files(dbx, local_folder, non_steam_app_files, self.dropbox_folder_path_non_steam, non_steam_games, progress=progress, task_id=task_id, grid_index=grid_index)
+        self.hash_cache.save()
+
+
+    def watch_remote_changes(self, local_folder, non_steam_games={}, grid_index=None, stop_event=None, on_change=None):
+        """
+        Block until stop_event is set, pulling remote changes as soon as Dropbox reports them.
+        Each grid folder is watched with files_list_folder_longpoll on its stored cursor, so
+        nothing is listed until something actually changed. The manifest journal is watched
+        too: the other machine writes its manifest after the files, so changes to existing
+        art are only downloadable once its journal delta arrives.
+
+        Args:
+            on_change (callable, optional): Called after each batch of remote changes is pulled.
+        """
+        stop_event = stop_event or threading.Event()
+        grid_index = grid_index or GridDirectoryIndex(local_folder)
+        # Rekey the non-Steam games dictionary to use the name as the key
+        non_steam_games = {self._hash_game_name(game['AppName']): game for game in non_steam_games.values()}
+        categories = ((self.dropbox_folder_path, True), (self.dropbox_folder_path_non_steam, False))
+
+        def pull_categories(dbx, pulled_categories):
+            self.remote_manifest = self._download_manifest()
+            for dropbox_folder_path, is_steam in pulled_categories:
+                self._download_newer_files_for_category(dbx, local_folder, dropbox_folder_path, non_steam_games, is_steam, grid_index=grid_index)
+
+        def pull_journal(dbx):
+            # Moves the journal cursor on, the grid listings themselves are unchanged
+            self._get_all_file_hashes_in_dropbox_folder(dbx, self.dropbox_manifest_journal_path)
+            pull_categories(dbx, categories)
+
+        watched = [(dropbox_folder_path, lambda dbx, category=(dropbox_folder_path, is_steam): pull_categories(dbx, [category]))
+                   for dropbox_folder_path, is_steam in categories]
+        watched.append((self.dropbox_manifest_journal_path, pull_journal))
+        watchers = [threading.Thread(target=self._watch_folder,
+                                     args=(dropbox_folder_path, pull, stop_event, on_change),
+                                     daemon=True)
+                    for dropbox_folder_path, pull in watched]
+        for watcher in watchers:
+            watcher.start()
+        for watcher in watchers:
+            watcher.join()
 
 
     def get_manifest(self):
@@ -77,69 +151,110 @@ class DropboxManager:
     
 
     def upload_manifest(self):
-        access_token = self._get_access_token()
-        if not access_token:
+        """
+        Upload only the entries that changed since the remote manifest was read, as a new
+        journal delta. Once DROPBOX_MANIFEST_MAX_JOURNAL deltas have piled up the manifest
+        is rewritten in full instead and the journal is cleared.
+        """
+        dbx = self.session.get_client()
+        if not dbx:
             print("Dropbox access token not found. Please authenticate first.")
             return
-        manifest_bytes = json.dumps(self.local_manifest).encode('utf-8')
-        self._upload_file_to_dropbox(access_token,
-                                     manifest_bytes,
-                                     self.dropbox_manifest_path)
-
-
-    def update_local_manifest_from_local_files(self, local_folder, non_steam_games):
-        for root, _, files in os.walk(local_folder):
-            for file_name in files:
-                local_file_path = os.path.join(root, file_name)
-                dropbox_file_path = self._get_dropbox_file_path(file_name, non_steam_games)
-                file_hash = self._calculate_dropbox_content_hash(local_file_path)
-                self._set_timestamp_if_hash_changed(dropbox_file_path, file_hash)
+        delta = sync_manifest.diff_manifest(self.remote_manifest, self.local_manifest)
+        if delta is None:
+            return
+
+        if len(self.manifest_journal) >= DROPBOX_MANIFEST_MAX_JOURNAL:
+            # Deltas up to this position are folded in, so readers skip them even before they are deleted
+            manifest = sync_manifest.encode_manifest(self.local_manifest, self.manifest_journal[-1])
+            if not self._upload_file_to_dropbox(dbx,
+                                                sync_manifest.dumps(manifest),
+                                                self.dropbox_manifest_path):
+                # The journal is still the only copy of those changes
+                return
+            self._delete_manifest_journal(dbx, self.manifest_journal)
+            self.manifest_journal = []
+        else:
+            journal_name = sync_manifest.new_journal_name()
+            if not self._upload_file_to_dropbox(dbx,
+                                                sync_manifest.dumps(delta),
+                                                f"{self.dropbox_manifest_journal_path}/{journal_name}",
+                                                mode=WriteMode('add')):
+                # Keep the remote manifest behind so the next upload diffs these changes again
+                return
+            self.manifest_journal.append(journal_name)
+        self.remote_manifest = {path: dict(entry) for path, entry in self.local_manifest.items()}
+
+
+    def update_local_manifest_from_local_files(self, local_folder, non_steam_games, grid_index=None):
+        grid_index = grid_index or GridDirectoryIndex(local_folder)
+        signatures = {grid_index.get_path(grid_file.filename): get_signature(grid_file.size, grid_file.mtime_ns)
+                      for grid_file in grid_index.files()}
+        self.hash_cache.retain(local_folder, signatures)
+
+        # Hash everything the cache doesn't know in one parallel pass
+        unhashed = [path for path, signature in signatures.items() if self.hash_cache.get(path, signature) is None]
+        for local_file_path, digests in hash_files(unhashed).items():
+            if digests is not None:
+                self.hash_cache.set(local_file_path, digests[DROPBOX_CONTENT_HASH], signatures[local_file_path])
+
+        for local_file_path, signature in signatures.items():
+            dropbox_file_path = self._get_dropbox_file_path(os.path.basename(local_file_path), non_steam_games)
+            file_hash = self._calculate_dropbox_content_hash(local_file_path, signature)
+            self._set_timestamp_if_hash_changed(dropbox_file_path, file_hash)
         
-        self._remove_deleted_files_from_manifest(local_folder, non_steam_games)
+        self._remove_deleted_files_from_manifest(local_folder, non_steam_games, grid_index)
 
 
     def _download_manifest(self):
-        access_token = self._get_access_token()
-        if not access_token:
+        dbx = self.session.get_client()
+        if not dbx:
             print("Dropbox access token not found. Please authenticate first.")
             return {}
         try:
-            manifest_bytes = self._download_file_from_dropbox(access_token, self.dropbox_manifest_path)
-            manifest_str = manifest_bytes.decode('utf-8')
-            manifest = json.loads(manifest_str)
-            if manifest:
-                return manifest
-            else:
-                return {}
-        except dropbox.exceptions.ApiError as e:
+            data = sync_manifest.loads(self._download_file_from_dropbox(dbx, self.dropbox_manifest_path))
+            manifest = sync_manifest.decode_manifest(data)
+            journal_position = sync_manifest.get_journal_position(data)
+
+            # Replay the deltas written since the manifest file was last rewritten
+            self.manifest_journal = []
+            for journal_name in self._list_manifest_journal(dbx):
+                if journal_position and journal_name <= journal_position:
+                    continue
+                delta_bytes = self._download_file_from_dropbox(dbx, f"{self.dropbox_manifest_journal_path}/{journal_name}")
+                if delta_bytes:
+                    sync_manifest.apply_delta(manifest, sync_manifest.loads(delta_bytes))
+                self.manifest_journal.append(journal_name)
+            return manifest
+        except (dropbox.exceptions.ApiError, ValueError) as e:
             print(f"Error downloading manifest from Dropbox: {e}")
             return {}
 
 
-    def _get_access_token(self):
-        url = "https://api.dropbox.com/oauth2/token"
-        data = {
-            "grant_type": "refresh_token",
-            "refresh_token": self.refresh_token,
-            "client_id": self.app_key,
-            "client_secret": self.app_secret,
-        }
-
-        response = requests.post(url, data=data)
-        response_data = response.json()
+    def _list_manifest_journal(self, dbx):
+        names = []
+        try:
+            result = dbx.files_list_folder(self.dropbox_manifest_journal_path)
+            names.extend(entry.name for entry in result.entries if isinstance(entry, dropbox.files.FileMetadata))
+            while result.has_more:
+                result = dbx.files_list_folder_continue(result.cursor)
+                names.extend(entry.name for entry in result.entries if isinstance(entry, dropbox.files.FileMetadata))
+        except dropbox.exceptions.ApiError as e:
+            # No journal folder until the first delta is written
+            if not (e.error.is_path() and e.error.get_path().is_not_found()):
+                raise
+        return sorted(names)
 
-        if response.status_code == 200:
-            access_token = response_data['access_token']
-            return access_token
-        else:
-            print(f"Failed to refresh access token: {response.content}")
-            return None
 
+    def _delete_manifest_journal(self, dbx, journal_names):
+        entries = [dropbox.files.DeleteArg(f"{self.dropbox_manifest_journal_path}/{journal_name}") for journal_name in journal_names]
+        try:
+            dbx.files_delete_batch(entries)
+        except dropbox.exceptions.ApiError as e:
+            print(f"Error clearing the manifest journal on Dropbox: {e}")
 
-    def _download_newer_files_for_category(self, access_token, local_folder, dropbox_folder_path, non_steam_games, is_steam, progress=None, task_id=None):       
-        self.remote_manifest = self._download_manifest()
-        dbx = dropbox.Dropbox(access_token)
 
+    def _download_newer_files_for_category(self, dbx, local_folder, dropbox_folder_path, non_steam_games, is_steam, progress=None, task_id=None, grid_index=None):       
         try:
             # Retrieve all file metadata in the Dropbox folder, handling pagination
             dropbox_file_metadata = self._get_all_file_hashes_in_dropbox_folder(dbx, dropbox_folder_path)
@@ -147,29 +262,24 @@ class DropboxManager:
                 dropbox_file_path = f"{dropbox_folder_path}/{dropbox_file_name}"
                 if not self._should_download_based_on_timestamps(dropbox_file_path):
                     return 0
-                game_name, postfix = self._extract_gameid_from_filename(dropbox_file_name)
-                clean_game_name = game_name.strip('{}')
-                local_file_name = dropbox_file_name
-
-                if not is_steam:
-                    if clean_game_name not in non_steam_games:
-                        return  0
-                    local_file_name = f"{non_steam_games[clean_game_name]['GridImageId']}{postfix}"
+                local_file_name = self._get_local_file_name(dropbox_file_name, non_steam_games, is_steam)
+                if local_file_name is None:
+                    return 0
                 local_file_path = os.path.join(local_folder, local_file_name)
 
-                if not os.path.isfile(local_file_path) or self._calculate_dropbox_content_hash(local_file_path) != dropbox_file_hash:
+                is_local = grid_index.get_file(local_file_name) is not None if grid_index else os.path.isfile(local_file_path)
+                if not is_local or self._calculate_dropbox_content_hash(local_file_path) != dropbox_file_hash:
                     # print(f"Downloading from Dropbox {dropbox_file_path} to {local_file_path}") # Optional logging
-                    self._download_file_from_dropbox_to_file(access_token, dropbox_folder_path + '/' + dropbox_file_name, local_file_path)
-                    if self.local_manifest.get(dropbox_file_path) is None:
-                        self.local_manifest[dropbox_file_path] = {}
-                    self.local_manifest[dropbox_file_path]['hash'] = dropbox_file_hash
-                    self.local_manifest[dropbox_file_path]['timestamp'] = self.remote_manifest[dropbox_file_path]['timestamp']
+                    if self._download_file_from_dropbox_to_file(dbx, dropbox_folder_path + '/' + dropbox_file_name, local_file_path):
+                        # The downloaded file's hash is already known from the listing
+                        self.hash_cache.set(local_file_path, dropbox_file_hash)
+                    self._record_download(dropbox_file_path, dropbox_file_hash, local_file_name, grid_index)
                     return 1
                 return 0
             if progress and task_id:
                 progress.update(task_id, total=len(dropbox_file_metadata))
 
-            with concurrent.futures.ThreadPoolExecutor() as executor:
+            with concurrent.futures.ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS) as executor:
                 futures = [executor.submit(process_file, item[0], item[1]) for item in dropbox_file_metadata.items()]
                 num_downloads = 0
                 for future in concurrent.futures.as_completed(futures):
@@ -182,6 +292,74 @@ class DropboxManager:
             print(f"Error during the download and verification process: {e}")
 
 
+    def _restore_category_from_zip(self, dbx, local_folder, dropbox_folder_path, non_steam_games, is_steam, grid_index):
+        """
+        Download a whole Dropbox folder as one zip and extract it into local_folder.
+
+        Returns:
+            int: Number of files restored.
+        """
+        dropbox_file_hashes = self._get_all_file_hashes_in_dropbox_folder(dbx, dropbox_folder_path)
+        if not dropbox_file_hashes:
+            return 0
+
+        num_restored = 0
+        try:
+            with tempfile.TemporaryFile() as archive:
+                metadata, res = dbx.files_download_zip(dropbox_folder_path)
+                with res:
+                    for chunk in res.iter_content(DROPBOX_DOWNLOAD_CHUNK_SIZE):
+                        archive.write(chunk)
+                archive.seek(0)
+
+                with zipfile.ZipFile(archive) as zip_file:
+                    for member in zip_file.infolist():
+                        dropbox_file_name = os.path.basename(member.filename)
+                        if member.is_dir() or dropbox_file_name not in dropbox_file_hashes:
+                            continue
+                        local_file_name = self._get_local_file_name(dropbox_file_name, non_steam_games, is_steam)
+                        if local_file_name is None:
+                            continue
+                        local_file_path = os.path.join(local_folder, local_file_name)
+                        temp_path = local_file_path + IN_PROGRESS_SUFFIX
+                        with zip_file.open(member) as source, open(temp_path, 'wb') as destination:
+                            shutil.copyfileobj(source, destination, DROPBOX_DOWNLOAD_CHUNK_SIZE)
+                        os.replace(temp_path, local_file_path)
+
+                        dropbox_file_hash = dropbox_file_hashes[dropbox_file_name]
+                        self.hash_cache.set(local_file_path, dropbox_file_hash)
+                        self._record_download(f"{dropbox_folder_path}/{dropbox_file_name}", dropbox_file_hash, local_file_name, grid_index)
+                        num_restored += 1
+        except (dropbox.exceptions.ApiError, requests.exceptions.RequestException, zipfile.BadZipFile, OSError) as e:
+            print(f"Error restoring {dropbox_folder_path} from Dropbox zip: {e}")
+
+        print(f"Restored {num_restored} files from Dropbox")
+        return num_restored
+
+
+    def _get_local_file_name(self, dropbox_file_name, non_steam_games, is_steam):
+        """
+        Returns:
+            str or None: The grid file name for a Dropbox file, or None if it belongs to no local shortcut.
+        """
+        if is_steam:
+            return dropbox_file_name
+        game_name, postfix = self._extract_gameid_from_filename(dropbox_file_name)
+        clean_game_name = game_name.strip('{}')
+        if clean_game_name not in non_steam_games:
+            return None
+        return f"{non_steam_games[clean_game_name]['GridImageId']}{postfix}"
+
+
+    def _record_download(self, dropbox_file_path, dropbox_file_hash, local_file_name, grid_index):
+        if grid_index:
+            grid_index.update(local_file_name)
+        if self.local_manifest.get(dropbox_file_path) is None:
+            self.local_manifest[dropbox_file_path] = {}
+        self.local_manifest[dropbox_file_path]['hash'] = dropbox_file_hash
+        self.local_manifest[dropbox_file_path]['timestamp'] = self.remote_manifest.get(dropbox_file_path, {}).get('timestamp', 0)
+
+
     def _get_dropbox_file_path(self, file_name, non_steam_games):
         game_id, postfix = self._extract_gameid_from_filename(file_name)
         if game_id not in non_steam_games:
@@ -196,12 +374,9 @@ class DropboxManager:
                 raise ValueError(f"Game ID {game_id} not found in non-Steam games list")
             
 
-    def _remove_deleted_files_from_manifest(self, local_folder, non_steam_games):
-        existing_files = set()
-        for root, _, files in os.walk(local_folder):
-            for file_name in files:
-                dropbox_file_path = self._get_dropbox_file_path(file_name, non_steam_games)
-                existing_files.add(dropbox_file_path)
+    def _remove_deleted_files_from_manifest(self, local_folder, non_steam_games, grid_index=None):
+        grid_index = grid_index or GridDirectoryIndex(local_folder)
+        existing_files = {self._get_dropbox_file_path(grid_file.filename, non_steam_games) for grid_file in grid_index.files()}
         
         keys_to_delete = [key for key in self.local_manifest if key not in existing_files]
         for key in keys_to_delete:
@@ -259,17 +434,26 @@ class DropboxManager:
         self.local_manifest[key]['timestamp'] = timestamp
 
 
-    def _download_file_from_dropbox_to_file(self, access_token, dropbox_path, local_path):
-        file = self._download_file_from_dropbox(access_token, dropbox_path)
+    def _download_file_from_dropbox_to_file(self, dbx, dropbox_path, local_path):
+        # Streamed to a temp file and renamed, so a failed download never leaves a partial image
+        temp_path = local_path + IN_PROGRESS_SUFFIX
         try:
-            with open(local_path, 'wb') as f:
-                f.write(file)
+            metadata, res = dbx.files_download(path=dropbox_path)
+            with res, open(temp_path, 'wb') as f:
+                for chunk in res.iter_content(DROPBOX_DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+            os.replace(temp_path, local_path)
+            return True
+        except dropbox.exceptions.ApiError as e:
+            print(f"Error downloading file: {e}")
         except Exception as e:
             print(f"Error writing file to disk: {e}")
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        return False
 
 
-    def _download_file_from_dropbox(self, access_token, dropbox_path):
-        dbx = dropbox.Dropbox(access_token)
+    def _download_file_from_dropbox(self, dbx, dropbox_path):
         try:
             metadata, res = dbx.files_download(path=dropbox_path)
             return res.content
@@ -278,8 +462,7 @@ class DropboxManager:
             return None
         
 
-    def _upload_newer_files(self, access_token, local_folder, files, dbx_folder, non_steam_games={}, progress=None, task_id=None):
-        dbx = dropbox.Dropbox(access_token)
+    def _upload_newer_files(self, dbx, local_folder, files, dbx_folder, non_steam_games={}, progress=None, task_id=None, grid_index=None):
         total_files = len(files)
 
         try:
@@ -297,26 +480,31 @@ class DropboxManager:
 
                 self._initialize_manifest_timestamp(dbx_filepath)
                 if not self._should_upload_based_on_timestamps(dbx_filepath):
-                    return 0
+                    return None
                 
-                if os.path.isfile(local_file_path):
+                is_local = grid_index.get_file(local_file_name) is not None if grid_index else os.path.isfile(local_file_path)
+                if is_local:
                     local_file_hash = self._calculate_dropbox_content_hash(local_file_path)
                     if dbx_filename not in dropbox_file_hashes or local_file_hash != dropbox_file_hashes[dbx_filename]:
                         # print(f"Uploading {local_file_path} to Dropbox {dbx_filepath}") # Optional logging
-                        self._upload_local_file_to_dropbox(access_token, local_file_path, dbx_folder, dbx_filename)
-                        return 1
-                return 0
+                        return self._start_upload_session(dbx, local_file_path, dbx_filepath)
+                return None
             
             if progress and task_id:
                 progress.update(task_id, total=total_files)
 
-            with concurrent.futures.ThreadPoolExecutor() as executor:
+            # File contents are sent in parallel upload sessions, then committed in batches
+            # so Dropbox takes one namespace write per batch instead of one per file
+            finished_sessions = []
+            with concurrent.futures.ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS) as executor:
                 futures = [executor.submit(process_file, f) for f in files]
-                num_uploaded = 0
                 for future in concurrent.futures.as_completed(futures):
-                    num_uploaded += future.result()
+                    finish_arg = future.result()
+                    if finish_arg is not None:
+                        finished_sessions.append(finish_arg)
                     if progress and task_id:
                         progress.update(task_id, advance=1)
+            num_uploaded = self._commit_upload_sessions(dbx, finished_sessions)
             print(f"Uploaded {num_uploaded} files to Dropbox")
 
 
@@ -324,61 +512,156 @@ class DropboxManager:
             print(f"Error during the upload and verification process: {e}")
 
 
-    def _upload_local_file_to_dropbox(self, access_token, local_file_path, dropbox_folder, new_filename=None):
-        if new_filename is None:
-            new_filename = os.path.basename(local_file_path)
-        dropbox_file_path = f"{dropbox_folder}/{new_filename}"
-        
-        with open(local_file_path, 'rb') as f:
-            file = f.read()
-            self._upload_file_to_dropbox(access_token, file, dropbox_file_path)
+    def _start_upload_session(self, dbx, local_file_path, dropbox_file_path):
+        """
+        Send a file's contents in an upload session, one chunk at a time, without committing it.
 
+        Returns:
+            UploadSessionFinishArg or None: What finish_batch needs to commit the file, or None on failure.
+        """
+        try:
+            with open(local_file_path, 'rb') as f:
+                chunk = f.read(DROPBOX_UPLOAD_CHUNK_SIZE)
+                next_chunk = f.read(DROPBOX_UPLOAD_CHUNK_SIZE)
+                # Sessions must be closed before they can be committed in a batch
+                session = dbx.files_upload_session_start(chunk, close=not next_chunk)
+                cursor = UploadSessionCursor(session_id=session.session_id, offset=len(chunk))
+                while next_chunk:
+                    chunk, next_chunk = next_chunk, f.read(DROPBOX_UPLOAD_CHUNK_SIZE)
+                    dbx.files_upload_session_append_v2(chunk, cursor, close=not next_chunk)
+                    cursor.offset += len(chunk)
+        except (OSError, dropbox.exceptions.ApiError) as e:
+            print(f"Error uploading file to {dropbox_file_path} on Dropbox: {e}")
+            return None
+        return UploadSessionFinishArg(cursor=cursor, commit=CommitInfo(path=dropbox_file_path, mode=WriteMode('overwrite')))
 
-    def _upload_file_to_dropbox(self, access_token, file, dropbox_path, mode=dropbox.files.WriteMode('overwrite')):
+
+    def _commit_upload_sessions(self, dbx, finish_args):
+        """
+        Returns:
+            int: Number of files committed.
+        """
+        num_committed = 0
+        for start in range(0, len(finish_args), DROPBOX_UPLOAD_BATCH_SIZE):
+            batch = finish_args[start:start + DROPBOX_UPLOAD_BATCH_SIZE]
+            try:
+                result = dbx.files_upload_session_finish_batch_v2(batch)
+            except dropbox.exceptions.ApiError as e:
+                print(f"Error committing {len(batch)} uploads on Dropbox: {e}")
+                continue
+            for finish_arg, entry in zip(batch, result.entries):
+                if entry.is_success():
+                    num_committed += 1
+                else:
+                    print(f"Error uploading file to {finish_arg.commit.path} on Dropbox: {entry.get_failure()}")
+        return num_committed
+
+
+    def _upload_file_to_dropbox(self, dbx, file, dropbox_path, mode=dropbox.files.WriteMode('overwrite')):
+        """
+        Returns:
+            bool: Whether the file was uploaded.
+        """
         try:
-            dbx = dropbox.Dropbox(access_token)
             dbx.files_upload(file, dropbox_path, mode=mode)
+            return True
         except dropbox.exceptions.ApiError as e:
             print(f"Error uploading file to {dropbox_path} on Dropbox: {e}")
+            return False
 
 
-    def _calculate_dropbox_content_hash(self, file_path):
+    def _calculate_dropbox_content_hash(self, file_path, signature=None):
         """
-        Calculate the Dropbox content hash for a given file.
-        Dropbox content hash is calculated by splitting the file into 4MB chunks,
-        SHA-256 hashing each chunk, concatenating the results, and then hashing
-        the concatenated result again.
+        Calculate the Dropbox content hash for a given file, reusing the cached
+        hash while the file's stat signature is unchanged.
         """
-        try:
-            block_size = 4 * 1024 * 1024  # 4MB
-            hash_func = hashlib.sha256()
-            with open(file_path, 'rb') as f:
-                while True:
-                    chunk = f.read(block_size)
-                    if not chunk:
-                        break
-                    chunk_hash = hashlib.sha256(chunk).digest()
-                    hash_func.update(chunk_hash)
-            return hash_func.hexdigest()
-        except FileNotFoundError:
-            print(f"Error computing hash, File not found: {file_path}")
-            return None
-    
+        return self.hash_cache.get_or_compute(file_path, calculate_dropbox_content_hash, signature)
+
+
+    def _watch_folder(self, dropbox_folder_path, pull, stop_event, on_change):
+        """
+        Longpoll dropbox_folder_path and call pull(dbx) whenever it changed. pull has to
+        list the folder, so its cursor moves past the reported changes.
+        """
+        while not stop_event.is_set():
+            # Fetched per poll so an expired access token gets refreshed
+            dbx = self.session.get_client()
+            if not dbx:
+                stop_event.wait(DROPBOX_LONGPOLL_TIMEOUT)
+                continue
+            cursor = self.listing_cache.get_cursor(dropbox_folder_path)
+            if cursor is None:
+                with self._watch_lock:
+                    self._get_all_file_hashes_in_dropbox_folder(dbx, dropbox_folder_path)
+                if self.listing_cache.get_cursor(dropbox_folder_path) is None:
+                    stop_event.wait(DROPBOX_LONGPOLL_TIMEOUT)
+                continue
+
+            try:
+                result = dbx.files_list_folder_longpoll(cursor, timeout=DROPBOX_LONGPOLL_TIMEOUT)
+            except requests.exceptions.Timeout:
+                # Dropbox's jitter can outlast the client timeout, treat it as no changes
+                continue
+            except (dropbox.exceptions.ApiError, requests.exceptions.RequestException) as e:
+                print(f"Error watching Dropbox folder {dropbox_folder_path}: {e}")
+                stop_event.wait(DROPBOX_LONGPOLL_TIMEOUT)
+                continue
+
+            if result.changes and not stop_event.is_set():
+                # One batch at a time, the other watchers wait until this one is applied
+                with self._watch_lock:
+                    pull(dbx)
+                    self.hash_cache.save()
+                    if on_change:
+                        on_change()
+            if result.backoff:
+                stop_event.wait(result.backoff)
+
 
     def _get_all_file_hashes_in_dropbox_folder(self, dbx, folder_path):
-        file_hashes = {}
+        """
+        List a folder's files and their content hashes. After the first listing only the
+        changes since the stored cursor are fetched and applied to the stored listing.
+        """
+        cursor, file_hashes = self.listing_cache.get(folder_path)
         try:
-            result = dbx.files_list_folder(folder_path)
-            file_hashes.update({entry.name: entry.content_hash for entry in result.entries if isinstance(entry, dropbox.files.FileMetadata)})
+            result = self._continue_listing(dbx, cursor) if cursor else None
+            if result is None:
+                file_hashes = {}
+                result = dbx.files_list_folder(folder_path)
+            self._apply_listing_entries(file_hashes, result.entries)
 
             while result.has_more:
                 result = dbx.files_list_folder_continue(result.cursor)
-                file_hashes.update({entry.name: entry.content_hash for entry in result.entries if isinstance(entry, dropbox.files.FileMetadata)})
+                self._apply_listing_entries(file_hashes, result.entries)
 
+            self.listing_cache.set(folder_path, result.cursor, file_hashes)
+            self.listing_cache.save()
         except dropbox.exceptions.ApiError as e:
             print(f"Error listing files in Dropbox folder: {e}")
 
         return file_hashes
+
+
+    def _continue_listing(self, dbx, cursor):
+        """
+        Returns:
+            ListFolderResult or None: Changes since cursor, or None if Dropbox reset the cursor.
+        """
+        try:
+            return dbx.files_list_folder_continue(cursor)
+        except dropbox.exceptions.ApiError as e:
+            if isinstance(e.error, ListFolderContinueError) and e.error.is_reset():
+                return None
+            raise
+
+
+    def _apply_listing_entries(self, file_hashes, entries):
+        for entry in entries:
+            if isinstance(entry, dropbox.files.FileMetadata):
+                file_hashes[entry.name] = entry.content_hash
+            elif isinstance(entry, dropbox.files.DeletedMetadata):
+                file_hashes.pop(entry.name, None)
     
 
     def _hash_game_name(self, game_name):
@@ -403,3 +686,14 @@ class DropboxManager:
             filename = filename.rstrip('p')
             postfix = filename_with_extension[len(filename):]
             return filename, postfix
+
+
+def calculate_dropbox_content_hash(file_path):
+    """
+    Calculate the Dropbox content hash for a given file.
+    Dropbox content hash is calculated by splitting the file into 4MB chunks,
+    SHA-256 hashing each chunk, concatenating the results, and then hashing
+    the concatenated result again.
+    """
+    digests = hash_file(file_path)
+    return digests[DROPBOX_CONTENT_HASH] if digests else None
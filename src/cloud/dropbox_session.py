@@ -0,0 +1,69 @@
+import dropbox
+import threading
+import time
+
+from api_proxies.constants import DEFAULT_MAX_WORKERS
+from api_proxies.http_transport import get_transport
+from cloud.constants import DROPBOX_TOKEN_EXPIRY_MARGIN, DROPBOX_TOKEN_URL
+from filemanagers.dropbox_token_file_manager import DropboxTokenFileManager
+
+
+class DropboxSession:
+    """
+    One Dropbox login shared by every call of a run.
+    The access token is refreshed only when it is about to expire and is kept on disk
+    for the next run. All calls go through a single thread-safe client whose connection
+    pool is sized for the worker threads using it.
+    """
+    def __init__(self, app_key, app_secret, refresh_token, pool_size=DEFAULT_MAX_WORKERS, token_file_manager=None):
+        self.app_key = app_key
+        self.app_secret = app_secret
+        self.refresh_token = refresh_token
+        self.token_file_manager = token_file_manager or DropboxTokenFileManager()
+        self._access_token, self._expires_at = self.token_file_manager.load_token(refresh_token)
+        self._http_session = dropbox.create_session(max_connections=pool_size)
+        self._client = None
+        self._client_token = None
+        self._lock = threading.Lock()
+
+
+    def get_access_token(self):
+        with self._lock:
+            return self._get_access_token()
+
+
+    def get_client(self):
+        """
+        Returns:
+            dropbox.Dropbox or None: The shared client, or None if no access token could be obtained.
+        """
+        with self._lock:
+            access_token = self._get_access_token()
+            if not access_token:
+                return None
+            if self._client is None or self._client_token != access_token:
+                self._client = dropbox.Dropbox(access_token, session=self._http_session)
+                self._client_token = access_token
+            return self._client
+
+
+    def _get_access_token(self):
+        if self._access_token and self._expires_at - DROPBOX_TOKEN_EXPIRY_MARGIN > time.time():
+            return self._access_token
+
+        data = {
+            "grant_type": "refresh_token",
+            "refresh_token": self.refresh_token,
+            "client_id": self.app_key,
+            "client_secret": self.app_secret,
+        }
+        response = get_transport().post(DROPBOX_TOKEN_URL, data=data)
+        if response.status_code != 200:
+            print(f"Failed to refresh access token: {response.content}")
+            return None
+
+        response_data = response.json()
+        self._access_token = response_data['access_token']
+        self._expires_at = time.time() + response_data.get('expires_in', 0)
+        self.token_file_manager.save_token(self.refresh_token, self._access_token, self._expires_at)
+        return self._access_token
@@ -0,0 +1,50 @@
+import threading
+
+from cloud.constants import NEXTCLOUD_FOLDER_CACHE_FILE_NAME
+from data.app_data import AppData
+from steam.steam_id import SteamId
+
+
+class NextcloudFolderCache:
+    """
+    The last listing of each Nextcloud folder with the folder ETag it was read at.
+    While the ETag is unchanged nothing below the folder changed, so the listing can be
+    reused without asking the server. Kept per Steam user and stored as
+    {remote_folder: {'etag': str, 'files': {filename: mod_time}}}.
+    """
+    def __init__(self, file_name, entries=None):
+        self.file_name = file_name
+        self.entries = entries if entries is not None else {}
+        self._lock = threading.Lock()
+
+
+    @classmethod
+    def load(cls, steam_id: SteamId):
+        file_name = NEXTCLOUD_FOLDER_CACHE_FILE_NAME.format(user_id=steam_id.get_steamid())
+        return cls(file_name, AppData.read_json_from_file(file_name, dict))
+
+
+    def save(self):
+        with self._lock:
+            AppData.save_json_to_file(self.file_name, self.entries, dict)
+
+
+    def get(self, remote_folder, etag):
+        """
+        Returns:
+            dict or None: The cached {filename: mod_time} listing, or None unless it was read at etag.
+        """
+        if etag is None:
+            return None
+        with self._lock:
+            entry = self.entries.get(remote_folder)
+            if entry is None or entry['etag'] != etag:
+                return None
+            return dict(entry['files'])
+
+
+    def set(self, remote_folder, etag, files):
+        if etag is None:
+            return
+        with self._lock:
+            self.entries[remote_folder] = {'etag': etag, 'files': dict(files)}
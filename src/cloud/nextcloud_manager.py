@@ -1,18 +1,24 @@
 import os
 
 from api_proxies.nextcloud_api_proxy import NextcloudApiProxy
+from cloud.nextcloud_folder_cache import NextcloudFolderCache
 
 class NextcloudManager:
-    def __init__(self, api_proxy: NextcloudApiProxy, base_folder=""):
+    def __init__(self, api_proxy: NextcloudApiProxy, base_folder="", folder_cache: NextcloudFolderCache = None):
         """
         Initialize the NextcloudManager.
 
         Args:
             api_proxy (NextcloudApiProxy): Instance to perform Nextcloud operations.
             base_folder (str): The base folder in Nextcloud to use for uploads/downloads.
+            folder_cache (NextcloudFolderCache, optional): Listings reused while the folder ETag is unchanged.
+                                                           Every listing goes to the server without it.
         """
         self.api_proxy = api_proxy
         self.base_folder = base_folder.strip('/')
+        self.folder_cache = folder_cache
+        # Collection ETags per parent folder, probed once per run and dropped once this run changes a folder
+        self._collection_etags = {}
 
 
     def _combine_folder(self, remote_folder):
@@ -76,9 +82,10 @@ class NextcloudManager:
             file_data = f.read()
 
         self.api_proxy.upload_file(file_data, remote_file)
+        self._collection_etags.clear()
 
 
-    def download_file(self, remote_file, local_file):
+    def download_file(self, remote_file, local_file, remote_mod_time=-1.0):
         """
         Download a single file from Nextcloud if the remote version is newer than the local version,
         or if the local file doesn't exist.
@@ -86,13 +93,16 @@ class NextcloudManager:
         Args:
             remote_file (str): The remote file path (relative to the cloud folder).
             local_file (str): The full path where the file should be saved locally.
+            remote_mod_time (float, optional): Known remote modification time from a folder listing
+                                               (or None if missing). Defaults to -1.0, which forces a lookup.
         """
         # Combine the remote file path with the cloud folder.
         # print(f"Ensuring remote folder exists for '{remote_file}'...")
         remote_file_path = self._combine_folder(remote_file)
         
-        # Get the remote file modification time.
-        remote_mod_time = self.api_proxy.get_remote_file_modtime(remote_file_path)
+        # Get the remote file modification time, unless the listing already provided it.
+        if remote_mod_time == -1.0:
+            remote_mod_time = self.api_proxy.get_remote_file_modtime(remote_file_path)
         if remote_mod_time is None:
             # print(f"Remote file '{remote_file_path}' does not exist. Skipping download.")
             return
@@ -115,6 +125,8 @@ class NextcloudManager:
         # print(f"Downloading '{remote_file_path}' to '{local_file}'...")
         # Download the file content.
         file_data = self.api_proxy.download_file(remote_file_path)
+        if file_data is None:
+            return
 
         # Ensure the local destination directory exists before writing the file.
         local_dir = os.path.dirname(local_file)
@@ -135,10 +147,36 @@ class NextcloudManager:
             remote_folder (str): The remote folder path.
 
         Returns:
-            list: A list of file names in the remote folder.
+            dict: Mapping of file names in the remote folder to their modification times.
         """
         remote_folder = self._combine_folder(remote_folder)
-        return self.api_proxy.list_remote_files(remote_folder)
+        parent_folder, _, folder_name = remote_folder.rpartition('/')
+        if self.folder_cache is None or not parent_folder:
+            return self.api_proxy.list_remote_files(remote_folder)
+
+        # The folder ETags come from one small listing of the parent, shared by every listing of the run
+        etags = self._collection_etags.get(parent_folder)
+        if etags is None:
+            etags = self.api_proxy.get_collection_etags(parent_folder)
+            self._collection_etags[parent_folder] = etags
+        etag = etags.get(folder_name)
+        files = self.folder_cache.get(remote_folder, etag)
+        if files is not None:
+            return files
+
+        # Something changed, so refresh every sibling folder with one request while at it
+        tree = self.api_proxy.list_remote_tree(parent_folder)
+        if tree is None:
+            files = self.api_proxy.list_remote_files(remote_folder)
+            self.folder_cache.set(remote_folder, etag, files)
+        else:
+            for folder, listing in tree.items():
+                if folder:
+                    self.folder_cache.set(f"{parent_folder}/{folder}", listing.get('etag'), listing['files'])
+                    etags[folder] = listing.get('etag')
+            files = tree.get(folder_name, {}).get('files', {})
+        self.folder_cache.save()
+        return dict(files)
 
 
     def delete_file(self, remote_file):
@@ -150,4 +188,5 @@ class NextcloudManager:
         """
         remote_file_path = self._combine_folder(remote_file)
         self.api_proxy.delete_file(remote_file_path)
+        self._collection_etags.clear()
 
@@ -1,10 +1,10 @@
 import os
 import concurrent.futures
 
-from steam.steam_image_handler import extract_appid_and_postfix
-
-STEAM_GRID_SYNC_DIR = "SteamGridSync"
-NON_STEAM_DIR = "SteamShortcutGridSync"
+from api_proxies.constants import DEFAULT_MAX_WORKERS
+from cloud.constants import NON_STEAM_DIR, STEAM_GRID_SYNC_DIR
+from steam.grid_directory_index import GridDirectoryIndex
+from steam.steam_image_handler import extract_appid_and_postfix, extract_cloud_name_and_postfix
 
 class SteamGridSyncManager:
     def __init__(self, cloud_manager, non_steam_games):
@@ -18,13 +18,14 @@ class SteamGridSyncManager:
         self.reverse_non_steam_games = {value['CloudName']: key for key, value in non_steam_games.items() if 'CloudName' in value}
 
 
-    def upload_directory(self, local_dir, progress=None, task_id=None):
+    def upload_directory(self, local_dir, progress=None, task_id=None, grid_index=None):
         """
         Process all files in a local directory for upload.
         If the local directory does not exist, the function will exit gracefully.
         
         Args:
             local_dir (str): The path to the local directory containing files to upload.
+            grid_index (GridDirectoryIndex, optional): Index of local_dir, built if not given.
         """
         if not os.path.isdir(local_dir):
             print(f"Info: Local source directory not found: '{local_dir}'. Skipping sync for this folder.")
@@ -37,7 +38,8 @@ class SteamGridSyncManager:
         steam_remote_files = self.cloud_manager.list_remote_files(STEAM_GRID_SYNC_DIR)
         non_steam_remote_files = self.cloud_manager.list_remote_files(NON_STEAM_DIR)
 
-        files_to_process = [f for f in os.listdir(local_dir) if not (f.endswith('.log') or f.startswith('.') or f.lower() == 'desktop.ini')]
+        grid_index = grid_index or GridDirectoryIndex(local_dir)
+        files_to_process = [f.filename for f in grid_index.files() if not (f.filename.endswith('.log') or f.filename.startswith('.') or f.filename.lower() == 'desktop.ini')]
         
         if progress and task_id and len(files_to_process) > 0:
             current_total = 0
@@ -49,8 +51,6 @@ class SteamGridSyncManager:
 
         def process_upload(filename):
             local_file = os.path.join(local_dir, filename)
-            if not os.path.isfile(local_file):
-                return
             appid, postfix, extension = extract_appid_and_postfix(filename)
             
             cloud_filename = f"{STEAM_GRID_SYNC_DIR}/{filename}"
@@ -63,14 +63,14 @@ class SteamGridSyncManager:
 
             self.cloud_manager.upload_file(local_file, cloud_filename, remote_mod_time=remote_mod_time)
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS) as executor:
             futures = [executor.submit(process_upload, f) for f in files_to_process]
             for future in concurrent.futures.as_completed(futures):
                 if progress and task_id:
                     progress.update(task_id, advance=1)
 
 
-    def download_steam_games_grid(self, local_dir, progress=None, task_id=None):
+    def download_steam_games_grid(self, local_dir, progress=None, task_id=None, grid_index=None):
         """
         Process all remote files in the Nextcloud folder for download.
         Assumes that self.api_proxy.list_remote_files() returns a dictionary
@@ -78,7 +78,9 @@ class SteamGridSyncManager:
         
         Args:
             local_dir (str): The path to the local directory where files will be downloaded.
+            grid_index (GridDirectoryIndex, optional): Index of local_dir, built if not given.
         """
+        grid_index = grid_index or GridDirectoryIndex(local_dir)
         # Retrieve remote files as a dictionary: {filename: mod_time}
         remote_files = self.cloud_manager.list_remote_files(f"{STEAM_GRID_SYNC_DIR}")
 
@@ -103,26 +105,15 @@ class SteamGridSyncManager:
             try:
                 appid, postfix, extension = extract_appid_and_postfix(filename)
                 
-                # 2. Look for any local file matching `appid` + `postfix` + .*
+                # 2. Look up any local file indexed under the same `appid` + `postfix`
                 # e.g. if remote is 123.jpg, look for 123.png, 123.jpeg, etc.
-                possible_conflicts = []
-                for f in os.listdir(local_dir):
-                    if f == filename: continue # Same file is handled by standard sync logic
-                    
-                    # Optimization: Filter by startswith first
-                    if f.startswith(appid):
-                         try:
-                            l_appid, l_postfix, l_ext = extract_appid_and_postfix(f)
-                            if l_appid == appid and l_postfix == postfix:
-                                possible_conflicts.append(f)
-                         except ValueError:
-                             continue
+                # Same file is handled by standard sync logic
+                possible_conflicts = [f for f in grid_index.find(appid, postfix) if f.filename != filename]
 
                 # 3. Compare with conflicts
                 for conflict_file in possible_conflicts:
-                    conflict_path = os.path.join(local_dir, conflict_file)
-                    l_mtime = os.path.getmtime(conflict_path)
-                    l_ctime = os.path.getctime(conflict_path)
+                    l_mtime = conflict_file.mtime_ns / 1e9
+                    l_ctime = conflict_file.ctime_ns / 1e9
                     
                     # Logic: If Local Alternative is NEWER -> Delete Remote File, Skip Download
                     if l_mtime > remote_mod_time or l_ctime > remote_mod_time:
@@ -130,30 +121,40 @@ class SteamGridSyncManager:
                     
                     # Logic: If Local Alternative is OLDER -> Delete Local File (allow download to replace it)
                     else:
-                        os.remove(conflict_path)
+                        grid_index.remove(conflict_file.filename)
 
             except ValueError:
                 pass # Filename parse error, proceed normally
 
-            self.cloud_manager.download_file(cloud_filename, local_file)
+            self.cloud_manager.download_file(cloud_filename, local_file, remote_mod_time=remote_mod_time)
+            grid_index.update(filename)
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS) as executor:
             futures = [executor.submit(process_download_steam, item) for item in remote_files_list]
             for future in concurrent.futures.as_completed(futures):
                 if progress and task_id:
                     progress.update(task_id, advance=1)
 
 
-    def download_non_steam_games_grid(self, local_dir, progress=None, task_id=None):
+    def download_non_steam_games_grid(self, local_dir, progress=None, task_id=None, grid_index=None):
         """
         Download remote files for non-Steam games (shortcuts) that match the local non_steam_games list.
         
         Args:
             local_dir (str): Local directory where the files should be saved.
-            remote_files (dict): Dictionary mapping remote filenames to their modification times.
+            grid_index (GridDirectoryIndex, optional): Index of local_dir, kept up to date with the downloads.
         """
         remote_files = self.cloud_manager.list_remote_files(f"{NON_STEAM_DIR}")
 
+        # Parse every remote filename once, so each shortcut finds its art with one lookup
+        remote_assets = {}
+        for filename, remote_mod_time in remote_files.items():
+            try:
+                cloud_name, postfix, extension = extract_cloud_name_and_postfix(filename)
+            except ValueError:
+                continue
+            remote_assets.setdefault(cloud_name, []).append((filename, postfix, extension, remote_mod_time))
+
         items_to_process = list(self.non_steam_games.items())
         if progress and task_id and len(items_to_process) > 0:
             current_total = 0
@@ -169,12 +170,7 @@ class SteamGridSyncManager:
             if not cloud_name:
                 return
 
-            for filename, remote_mod_time in remote_files.items():
-                if cloud_name not in filename:
-                    continue
-
-                appid, postfix, extension = extract_appid_and_postfix(filename)
-                
+            for filename, postfix, extension, remote_mod_time in remote_assets.get(cloud_name, []):
                 local_filename = game_info.get('GridImageId', None)
                 if local_filename is None:
                     continue
@@ -182,9 +178,11 @@ class SteamGridSyncManager:
                 local_file = os.path.join(local_dir, local_filename)
 
                 remote_file_path = f"{NON_STEAM_DIR}/{filename}"
-                self.cloud_manager.download_file(remote_file_path, local_file)
+                self.cloud_manager.download_file(remote_file_path, local_file, remote_mod_time=remote_mod_time)
+                if grid_index is not None:
+                    grid_index.update(local_filename)
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=DEFAULT_MAX_WORKERS) as executor:
             futures = [executor.submit(process_download_non_steam, item) for item in items_to_process]
             for future in concurrent.futures.as_completed(futures):
                 if progress and task_id:
@@ -0,0 +1,106 @@
+"""
+Compact sync manifest format.
+A manifest maps Dropbox paths to {'hash': str, 'timestamp': int}. On disk and in Dropbox
+the folder part of each path is interned once in 'prefixes', and every entry is stored as
+[prefix index, file name, hash, timestamp], with None for fields the entry doesn't have.
+Deltas use the same layout plus the 'removed' paths as [prefix index, file name].
+The original format (the manifest dict itself, as indented JSON) is still read.
+"""
+import json
+import time
+import uuid
+
+from cloud.constants import MANIFEST_FORMAT_VERSION
+
+
+def encode_manifest(manifest, journal_position=None):
+    """
+    Args:
+        journal_position (str, optional): Name of the last journal delta already folded into manifest.
+    """
+    data = _encode_entries(manifest)
+    if journal_position:
+        data['journal'] = journal_position
+    return data
+
+
+def decode_manifest(data):
+    if not data:
+        return {}
+    if data.get('v') != MANIFEST_FORMAT_VERSION:
+        # Original format, already keyed by path
+        return {path: entry for path, entry in data.items() if isinstance(entry, dict)}
+    return _decode_entries(data)
+
+
+def get_journal_position(data):
+    return data.get('journal') if data and data.get('v') == MANIFEST_FORMAT_VERSION else None
+
+
+def diff_manifest(old_manifest, new_manifest):
+    """
+    Returns:
+        dict or None: A delta turning old_manifest into new_manifest, or None if they are equal.
+    """
+    changed = {path: entry for path, entry in new_manifest.items() if old_manifest.get(path) != entry}
+    removed = [path for path in old_manifest if path not in new_manifest]
+    if not changed and not removed:
+        return None
+    return _encode_entries(changed, removed)
+
+
+def apply_delta(manifest, delta):
+    manifest.update(_decode_entries(delta))
+    prefixes = delta['prefixes']
+    for prefix_index, name in delta.get('removed', []):
+        manifest.pop(f"{prefixes[prefix_index]}/{name}", None)
+    return manifest
+
+
+def new_journal_name():
+    # Sorts in upload order; the random part keeps two machines from colliding
+    return f"{int(time.time() * 1000):015d}-{uuid.uuid4().hex[:8]}.json"
+
+
+def dumps(data):
+    return json.dumps(data, separators=(',', ':')).encode('utf-8')
+
+
+def loads(data_bytes):
+    return json.loads(data_bytes.decode('utf-8')) if data_bytes else {}
+
+
+def _encode_entries(manifest, removed=None):
+    prefixes = []
+    prefix_indexes = {}
+    entries = []
+    for path, entry in manifest.items():
+        prefix_index, name = _split_path(path, prefixes, prefix_indexes)
+        timestamp = entry.get('timestamp')
+        entries.append([prefix_index, name, entry.get('hash'), None if timestamp is None else int(timestamp)])
+    data = {'v': MANIFEST_FORMAT_VERSION, 'prefixes': prefixes, 'entries': entries}
+    if removed is not None:
+        data['removed'] = [_split_path(path, prefixes, prefix_indexes) for path in removed]
+    return data
+
+
+def _decode_entries(data):
+    prefixes = data['prefixes']
+    manifest = {}
+    for prefix_index, name, file_hash, timestamp in data.get('entries', []):
+        entry = {}
+        if file_hash is not None:
+            entry['hash'] = file_hash
+        if timestamp is not None:
+            entry['timestamp'] = timestamp
+        manifest[f"{prefixes[prefix_index]}/{name}"] = entry
+    return manifest
+
+
+def _split_path(path, prefixes, prefix_indexes):
+    prefix, _, name = path.rpartition('/')
+    prefix_index = prefix_indexes.get(prefix)
+    if prefix_index is None:
+        prefix_index = prefix_indexes[prefix] = len(prefixes)
+        prefixes.append(prefix)
+    return [prefix_index, name]
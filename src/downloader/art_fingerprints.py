@@ -0,0 +1,78 @@
+import os
+import threading
+
+from data.app_data import AppData
+from downloader.constants import CODEC_ORIGINAL, CODEC_PNG
+
+
+class ArtFingerprints:
+    """
+    Records how each stored image was processed, so it is never processed twice.
+    A fingerprint is the processing profile plus the file's size and mtime_ns; it
+    only matches while the file is unchanged. Entries are stored as
+    {path: [size, mtime_ns, profile]}.
+    """
+    FILE_NAME = 'art_fingerprints.json'
+
+    def __init__(self, entries=None):
+        self.entries = entries if entries is not None else {}
+        self._lock = threading.Lock()
+
+
+    @classmethod
+    def load(cls):
+        return cls(AppData.read_json_from_file(cls.FILE_NAME, dict))
+
+
+    def save(self):
+        with self._lock:
+            AppData.save_json_to_file(self.FILE_NAME, self.entries, dict)
+
+
+    def record(self, file_path, profile):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return
+        with self._lock:
+            self.entries[file_path] = [stat.st_size, stat.st_mtime_ns, profile]
+
+
+    def matches(self, file_path, profile):
+        with self._lock:
+            entry = self.entries.get(file_path)
+        if entry is None or entry[2] != profile:
+            return False
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return False
+        return entry[0] == stat.st_size and entry[1] == stat.st_mtime_ns
+
+
+    def retain(self, folder, file_paths):
+        """Forget files in folder that are not in file_paths, e.g. deleted or renamed art."""
+        folder = os.path.normpath(folder)
+        file_paths = set(file_paths)
+        with self._lock:
+            stale = [path for path in self.entries
+                     if os.path.normpath(os.path.dirname(path)) == folder and path not in file_paths]
+            for path in stale:
+                del self.entries[path]
+
+
+def get_size_profile(max_size):
+    return f"{max_size[0]}x{max_size[1]}" if max_size else 'original'
+
+
+def get_processing_profile(max_size, codec=None):
+    """
+    Profile for a size limit plus an output codec given as (name, quality).
+    Images kept in their original format only carry the size part.
+    """
+    profile = get_size_profile(max_size)
+    if codec is None or codec[0] == CODEC_ORIGINAL:
+        return profile
+    if codec[0] == CODEC_PNG:
+        return f"{profile}@{codec[0]}"
+    return f"{profile}@{codec[0]}:{codec[1]}"
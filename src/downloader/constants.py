@@ -0,0 +1,24 @@
+from steam.constants import ART_GRID, ART_HERO, ART_HORIZONTAL, ART_LOGO
+
+
+# Largest size Steam displays each asset at. Bigger downloads are scaled down
+# (keeping their aspect ratio) once, when they are saved to the grid folder.
+ASSET_SIZE_PROFILES = {
+    ART_GRID: (600, 900),
+    ART_HORIZONTAL: (920, 430),
+    ART_HERO: (1920, 620),
+    ART_LOGO: (1280, 720),
+}
+
+# Output codecs for stored art. 'original' keeps the downloaded bytes whenever Steam can
+# display them; the others re-encode every image once, at the given quality for the lossy ones.
+CODEC_ORIGINAL = 'original'
+CODEC_PNG = 'png'
+CODEC_JPEG = 'jpeg'
+CODEC_WEBP = 'webp'
+CODEC_EXTENSIONS = {
+    CODEC_PNG: '.png',
+    CODEC_JPEG: '.jpg',
+    CODEC_WEBP: '.webp',
+}
+DEFAULT_CODEC_QUALITY = 90
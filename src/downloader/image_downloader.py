@@ -1,13 +1,301 @@
 import argparse
-import requests
+import concurrent.futures
+import os
+import tempfile
+import threading
 
 from PIL import Image
 from io import BytesIO
 
+from api_proxies.http_transport import get_transport
+from downloader.art_fingerprints import get_processing_profile
+from downloader.constants import (
+    CODEC_EXTENSIONS,
+    CODEC_ORIGINAL,
+    DEFAULT_CODEC_QUALITY
+)
+
+
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+# Formats the Steam client displays from the grid folder, by their leading magic bytes.
+# Anything else is transcoded to PNG.
+STEAM_IMAGE_SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', '.png'),
+    (b'\xff\xd8\xff', '.jpg'),
+)
+STEAM_WEBP_EXTENSION = '.webp'
+STEAM_IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+
+# Pillow format and encoder settings used when an image has to be written again
+IMAGE_FORMATS = {
+    '.png': 'PNG',
+    '.jpg': 'JPEG',
+    '.webp': 'WEBP',
+}
+IMAGE_SAVE_OPTIONS = {
+    'PNG': {'optimize': True},
+    'JPEG': {'optimize': True, 'progressive': True},
+    'WEBP': {'method': 6},
+}
+LOSSY_IMAGE_FORMATS = ('JPEG', 'WEBP')
+
+
+class CodecPolicy:
+    """
+    Output codec for stored art, with per-asset-type overrides. Codecs are handed
+    around as (name, quality) tuples. In the config this is either a codec name, e.g.
+    "webp", or {"codec": "webp", "quality": 80, "overrides": {"logo": "png"}} where
+    each override is a codec name or a {"codec", "quality"} dict of its own.
+    """
+    def __init__(self, codec=CODEC_ORIGINAL, quality=DEFAULT_CODEC_QUALITY, overrides=None):
+        self.default = _validate_codec(codec, quality)
+        self.overrides = {asset_type: _validate_codec(*override)
+                          for asset_type, override in (overrides or {}).items()}
+
+
+    @classmethod
+    def from_config(cls, value):
+        if not value:
+            return cls()
+        if isinstance(value, str):
+            return cls(value)
+        quality = value.get('quality', DEFAULT_CODEC_QUALITY)
+        overrides = {}
+        for asset_type, override in value.get('overrides', {}).items():
+            if isinstance(override, str):
+                overrides[asset_type] = (override, quality)
+            else:
+                overrides[asset_type] = (override.get('codec', CODEC_ORIGINAL), override.get('quality', quality))
+        return cls(value.get('codec', CODEC_ORIGINAL), quality, overrides)
+
+
+    def for_asset(self, asset_type):
+        return self.overrides.get(asset_type, self.default)
+
+
+def _validate_codec(codec, quality=DEFAULT_CODEC_QUALITY):
+    codec = str(codec).lower()
+    if codec != CODEC_ORIGINAL and codec not in CODEC_EXTENSIONS:
+        raise Exception(f"Unknown image codec '{codec}', expected one of: "
+                        f"{', '.join([CODEC_ORIGINAL, *CODEC_EXTENSIONS])}")
+    quality = int(quality)
+    if not 1 <= quality <= 100:
+        raise Exception(f"Image quality must be between 1 and 100, got {quality}")
+    return codec, quality
+
+
+class ImageTranscodePool:
+    """
+    Transcoding stage backed by worker processes, so Pillow's decode/encode work runs on
+    every core instead of being serialized by the GIL on the download threads.
+    At most max_pending transcodes are queued; submit() blocks beyond that so downloads
+    cannot run arbitrarily far ahead of the encoders. The worker processes are only
+    started once the first image actually needs transcoding.
+    """
+    def __init__(self, max_workers=None, max_pending=None):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self._slots = threading.BoundedSemaphore(max_pending or 2 * self.max_workers)
+        self._executor = None
+        self._lock = threading.Lock()
+
+
+    def submit(self, source_path, destination_path, image_format='PNG', max_size=None, quality=DEFAULT_CODEC_QUALITY):
+        """
+        Queue a transcode of source_path into destination_path, scaled down to fit
+        max_size if given. The source is removed once the job finishes, unless it is
+        the destination itself.
+
+        Returns:
+            concurrent.futures.Future: Resolves to destination_path, or None on failure.
+        """
+        self._slots.acquire()
+        try:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = concurrent.futures.ProcessPoolExecutor(max_workers=self.max_workers)
+                future = self._executor.submit(_transcode_job, source_path, destination_path,
+                                               image_format, max_size, quality)
+        except Exception:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+
+    def close(self, wait=True):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait)
+                self._executor = None
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+def _transcode_job(source_path, destination_path, image_format, max_size=None, quality=DEFAULT_CODEC_QUALITY):
+    # Runs in a worker process
+    temp_path = destination_path + '.part'
+    try:
+        transcode_image(source_path, temp_path, image_format, max_size, quality)
+        os.replace(temp_path, destination_path)
+        remove_other_extensions(destination_path)
+        return destination_path
+    except Exception as e:
+        print(f"Error transcoding {source_path}: {e}")
+        return None
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        if source_path != destination_path and os.path.exists(source_path):
+            os.remove(source_path)
+
+
+def save_image(url, file_path_without_extension, transcoder=None, max_size=None, fingerprints=None, codec=None):
+    """
+    Stream an image straight to disk. With the original codec the downloaded bytes are
+    kept when Steam can display the format and the image fits max_size; otherwise it is
+    scaled down and/or re-encoded. The file only appears under its final name once
+    complete, and copies of the same image with another extension are removed.
+
+    Args:
+        url (str): URL of the image.
+        file_path_without_extension (str): Destination path, the extension is picked from the image.
+        transcoder (ImageTranscodePool, optional): Pool to hand transcodes to. Without one,
+                                                   transcoding happens on the calling thread.
+        max_size (tuple, optional): (width, height) the image has to fit in.
+        fingerprints (ArtFingerprints, optional): Where to record how the output was processed.
+        codec (tuple, optional): (name, quality) to store the image as, see CodecPolicy.
+
+    Returns:
+        str or None: The path written (or being written by the transcoder), or None if the
+                     download failed.
+    """
+    directory = os.path.dirname(file_path_without_extension)
+    temp_path = None
+    try:
+        with get_transport().get(url, stream=True) as response:
+            if response.status_code != 200:
+                # print(f"Failed to download image from {url}. Status code: {response.status_code}")
+                return None
+            fd, temp_path = tempfile.mkstemp(dir=directory, suffix='.part')
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+
+        profile = get_processing_profile(max_size, codec)
+        extension, needs_transcode = plan_image_output(temp_path, max_size, codec)
+        file_path = file_path_without_extension + extension
+        if needs_transcode:
+            source_path, temp_path = temp_path, None
+            return process_image(source_path, file_path, transcoder, max_size, codec, fingerprints)
+        else:
+            os.replace(temp_path, file_path)
+            temp_path = None
+            remove_other_extensions(file_path)
+        if fingerprints is not None:
+            fingerprints.record(file_path, profile)
+        return file_path
+    except Exception as e:
+        # print(f"Error occurred while saving image: {e}")
+        return None
+    finally:
+        if temp_path is not None and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def process_image(source_path, file_path, transcoder=None, max_size=None, codec=None, fingerprints=None):
+    """
+    Scale down and/or re-encode source_path into file_path, on the transcoder's worker
+    processes when one is given. The format is taken from file_path's extension.
+
+    Returns:
+        str or None: file_path, or None if the inline transcode failed.
+    """
+    image_format = IMAGE_FORMATS[os.path.splitext(file_path)[1]]
+    quality = codec[1] if codec else DEFAULT_CODEC_QUALITY
+    profile = get_processing_profile(max_size, codec)
+    if transcoder is not None:
+        future = transcoder.submit(source_path, file_path, image_format, max_size, quality)
+        if fingerprints is not None:
+            future.add_done_callback(lambda f: _record_fingerprint(fingerprints, f.result(), profile))
+        return file_path
+    if _transcode_job(source_path, file_path, image_format, max_size, quality) is None:
+        return None
+    if fingerprints is not None:
+        fingerprints.record(file_path, profile)
+    return file_path
+
+
+def _record_fingerprint(fingerprints, file_path, profile):
+    if file_path is not None:
+        fingerprints.record(file_path, profile)
+
+
+def get_steam_image_extension(file_path):
+    """
+    Returns:
+        str or None: The extension for the image if Steam can display it as is.
+    """
+    with open(file_path, 'rb') as f:
+        header = f.read(16)
+    for signature, extension in STEAM_IMAGE_SIGNATURES:
+        if header.startswith(signature):
+            return extension
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return STEAM_WEBP_EXTENSION
+    return None
+
+
+def plan_image_output(file_path, max_size=None, codec=None):
+    """
+    Decide how an image has to be stored, reading only its header. Animated images keep
+    their format and size since re-encoding or resizing would drop their frames.
+
+    Returns:
+        tuple: (extension, needs_transcode)
+    """
+    source_extension = get_steam_image_extension(file_path)
+    with Image.open(file_path) as image:
+        animated = getattr(image, 'is_animated', False)
+        too_large = bool(max_size) and (image.width > max_size[0] or image.height > max_size[1])
+    codec_name = codec[0] if codec else CODEC_ORIGINAL
+    if source_extension is not None and (animated or codec_name == CODEC_ORIGINAL):
+        return source_extension, too_large and not animated
+    if codec_name == CODEC_ORIGINAL:
+        return '.png', True
+    return CODEC_EXTENSIONS[codec_name], True
+
+
+def transcode_image(source_path, destination_path, image_format, max_size=None, quality=DEFAULT_CODEC_QUALITY):
+    with Image.open(source_path) as image:
+        image.load()
+    if max_size:
+        image.thumbnail(max_size, Image.Resampling.LANCZOS)
+    if image_format == 'JPEG' and image.mode not in ('RGB', 'L'):
+        image = image.convert('RGB')
+    options = dict(IMAGE_SAVE_OPTIONS.get(image_format, {}))
+    if image_format in LOSSY_IMAGE_FORMATS:
+        options['quality'] = quality
+    image.save(destination_path, format=image_format, **options)
+
+
+def remove_other_extensions(file_path):
+    base, extension = os.path.splitext(file_path)
+    for other_extension in STEAM_IMAGE_EXTENSIONS:
+        other_path = base + other_extension
+        if other_extension != extension and os.path.exists(other_path):
+            os.remove(other_path)
+
 
 def save_image_as_png(url, filename):
     try:
-        response = requests.get(url)
+        response = get_transport().get(url)
         if response.status_code == 200:
             image_data = BytesIO(response.content)
             image = Image.open(image_data)
@@ -21,10 +309,12 @@ def save_image_as_png(url, filename):
 
 
 if __name__ == "__main__":
-    parser = argparse.ArgumentParser(description='Check for Steam games without 600x900 grid images.')
+    parser = argparse.ArgumentParser(description='Download an image, keeping its original format when Steam supports it.')
     parser.add_argument('--url', type=str, help='URL of image being downloads')
-    parser.add_argument('--filename', type=str, help='File name of where to save image')
+    parser.add_argument('--filename', type=str, help='File name of where to save image, without extension')
+    parser.add_argument('--codec', type=str, default=CODEC_ORIGINAL, help='original, png, jpeg or webp')
+    parser.add_argument('--quality', type=int, default=DEFAULT_CODEC_QUALITY, help='Quality for jpeg and webp')
 
     args = parser.parse_args()
 
-    games = save_image_as_png(args.url, args.filename)
+    print(save_image(args.url, args.filename, codec=_validate_codec(args.codec, args.quality)))
@@ -17,6 +17,14 @@ class ConfigFileManager(FileManagerBase):
         'dropbox_refresh_token',
         'nextcloud_password' # Fixed typo 'nextcloud_passowrd' -> 'nextcloud_password' (assuming schema matches) - Wait, schema uses 'nextcloud_password'. The typo was in this file likely? Or I should check schema again. Schema has "nextcloud_password".
     ]
+    # Advanced settings edited by hand in config.json, they aren't in the schema but survive edit_preferences
+    MANUAL_FIELDS = [
+        'art_codec',
+        'art_size_profiles',
+        'art_download_workers',
+        'rate_limits',
+        'nextcloud_base_folder',
+    ]
     FILE_NAME = 'config.json'
 
     def __init__(self):
@@ -46,6 +54,8 @@ class ConfigFileManager(FileManagerBase):
             user_config = config_prompt.get_config()
 
         if user_config:
+            manual_config = {key: current_config[key] for key in self.MANUAL_FIELDS if key in (current_config or {})}
+            user_config = {**manual_config, **user_config}
             super().save_file(user_config)
         return user_config
 
@@ -1,6 +1,7 @@
 import json
 import os
 
+from cloud.sync_manifest import decode_manifest, dumps, encode_manifest
 from filemanagers.file_manager_base import FileManagerBase
 from steam.steam_id import SteamId
 
@@ -13,12 +14,14 @@ class DropboxManifestFileManager(FileManagerBase):
 
     def load_or_create_manifest(self):
         self._ensure_empty_file() 
-        manifest = super().load_file()
-        return manifest
+        return decode_manifest(super().load_file())
 
 
     def save_manifest(self, manifest):
-        return super().save_file(manifest)
+        # Compact format; indented JSON is slow to write at tens of thousands of entries
+        with open(self._get_file_path(), 'wb') as f:
+            f.write(dumps(encode_manifest(manifest)))
+        return manifest
 
 
     def _ensure_empty_file(self):
@@ -0,0 +1,46 @@
+import hashlib
+import os
+
+from config.encryption_manager import EncryptionManager
+from filemanagers.file_manager_base import FileManagerBase
+
+
+class DropboxTokenFileManager(FileManagerBase):
+    """
+    Keeps the last short-lived Dropbox access token between runs, encrypted like the config.
+    The token is tied to the refresh token it was issued for, so it is ignored once
+    Dropbox is linked to another account.
+    """
+    ENCRYPTED_FIELDS = ['access_token']
+    FILE_NAME = 'dropbox_token.json'
+
+    def __init__(self):
+        super().__init__(filename=self.FILE_NAME, encryption_fields=self.ENCRYPTED_FIELDS)
+
+
+    def load_token(self, refresh_token):
+        """
+        Returns:
+            tuple: (access_token, expires_at), or (None, 0) if there is no usable token.
+        """
+        if not os.path.exists(self._get_file_path()):
+            return None, 0
+        data = super().load_file()
+        if not data or data.get('refresh_token_hash') != _hash_refresh_token(refresh_token):
+            return None, 0
+        return data.get('access_token'), data.get('expires_at', 0)
+
+
+    def save_token(self, refresh_token, access_token, expires_at):
+        salt = EncryptionManager.generate_salt()
+        super().save_file({
+            'access_token': self._encrypt(access_token, salt),
+            'expires_at': int(expires_at),
+            'refresh_token_hash': _hash_refresh_token(refresh_token),
+            'encryption_salt': salt,
+            '_encrypted_fields': self.ENCRYPTED_FIELDS,
+        })
+
+
+def _hash_refresh_token(refresh_token):
+    return hashlib.sha256(refresh_token.encode('utf-8')).hexdigest()
@@ -1,6 +1,10 @@
+import multiprocessing
+import threading
+
 from cloud.dropbox_manager import DropboxManager
 from filemanagers.config_file_manager import ConfigFileManager
 from config.start_on_boot_manager import start_on_boot
+from steam.grid_directory_index import GridDirectoryIndex
 from steam.launch_steam import launch_steam
 from steam.steam_directory_finder import get_grid_path, get_steam_ids
 from steam.steam_image_downloader import download_missing_images
@@ -10,9 +14,14 @@ from steam.steam_id import SteamId
 from steam.steam_directory_finder import get_steam_path
 from filemanagers.dropbox_manifest_file_manager import DropboxManifestFileManager
 
+from api_proxies.constants import DEFAULT_MAX_WORKERS
+from api_proxies.http_transport import configure_transport, get_transport
 from api_proxies.nextcloud_api_proxy import NextcloudApiProxy
+from api_proxies.rate_limiter import configure_rate_limits
+from cloud.nextcloud_folder_cache import NextcloudFolderCache
 from cloud.nextcloud_manager import NextcloudManager
 from cloud.steam_grid_sync_manager import SteamGridSyncManager
+from downloader.image_downloader import CodecPolicy
 
 from rich.console import Console
 from rich.progress import Progress, SpinnerColumn, BarColumn, TextColumn, TimeRemainingColumn
@@ -67,6 +76,8 @@ def main():
                 return
 
         start_on_boot(config.get('start_on_boot', False))
+        configure_rate_limits(config.get('rate_limits'))
+        configure_transport(pool_size=config.get('art_download_workers', DEFAULT_MAX_WORKERS))
         
         if config['remove_whats_new']:
             progress.update(setup_task, description="[green]Removing 'What's New' section...")
@@ -87,19 +98,52 @@ def main():
         else:
             steam_ids = [SteamId(steamid64=steam_id64.strip()) for steam_id64 in steam_id64s.split(',')]
 
+        watchers = []
         for steam_id in steam_ids: 
             user_task = progress.add_task(f"[bold blue]Processing User: {steam_id.get_steamid()}", total=None)
-            _run_task_for_user(config, steam_path, steam_id, progress)
+            watcher = _run_task_for_user(config, steam_path, steam_id, progress)
+            if watcher:
+                watchers.append(watcher)
             progress.update(user_task, completed=100) # Keep visible so we know which user was processed
 
 
 
+    http_stats = get_transport().get_stats()
+    if http_stats:
+        total_requests = sum(host['requests'] for host in http_stats.values())
+        total_connections = sum(host['connections'] for host in http_stats.values())
+        console.print(f"[dim]HTTP: {total_requests} requests over {total_connections} connections[/dim]")
     console.print("[bold green]All tasks completed successfully![/bold green]")
 
+    if watchers:
+        _watch_dropbox(watchers)
+
+
+def _watch_dropbox(watchers):
+    console.print("[cyan]☁️  Dropbox: Watching for remote changes (Ctrl+C to stop)...[/cyan]")
+    stop_event = threading.Event()
+    threads = [threading.Thread(target=watcher, args=(stop_event,), daemon=True) for watcher in watchers]
+    for thread in threads:
+        thread.start()
+    try:
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(timeout=1)
+    except KeyboardInterrupt:
+        stop_event.set()
+        console.print("[yellow]Stopped watching Dropbox.[/yellow]")
+
 
 def _run_task_for_user(config, steam_path, steam_id: SteamId, progress):
+    """
+    Returns:
+        callable or None: Watches Dropbox for this user until the given stop event is set,
+                          if 'dropbox_watch' is enabled.
+    """
     local_grid_file_path = get_grid_path(steam_id)
     non_steam_games = parse_shortcuts_vdf(steam_path, steam_id)
+    # One scan of the grid folder, kept up to date by every phase below
+    grid_index = GridDirectoryIndex(local_grid_file_path)
     sync_manager = None
 
     if config.get('nextcloud_url', False):
@@ -107,7 +151,7 @@ def _run_task_for_user(config, steam_path, steam_id: SteamId, progress):
         # console.print(f"Nextcloud URL: {config['nextcloud_url']}")
         cloud_folder = f"{config.get('nextcloud_base_folder', 'SteamBeautifier')}/{steam_id.get_steamid()}"
         api_proxy = NextcloudApiProxy(config['nextcloud_url'], config['nextcloud_user'], config['nextcloud_password'])
-        nextcloud_manager = NextcloudManager(api_proxy, cloud_folder)
+        nextcloud_manager = NextcloudManager(api_proxy, cloud_folder, NextcloudFolderCache.load(steam_id))
         sync_manager = SteamGridSyncManager(nextcloud_manager, non_steam_games)
         # progress.update(cloud_task, completed=100)
 
@@ -123,8 +167,8 @@ def _run_task_for_user(config, steam_path, steam_id: SteamId, progress):
     if sync_manager:
         sync_id = progress.add_task("☁️  Nextcloud: Syncing from cloud...", total=None)
         try:
-            sync_manager.download_steam_games_grid(local_grid_file_path, progress=progress, task_id=sync_id)
-            sync_manager.download_non_steam_games_grid(local_grid_file_path, progress=progress, task_id=sync_id)
+            sync_manager.download_steam_games_grid(local_grid_file_path, progress=progress, task_id=sync_id, grid_index=grid_index)
+            sync_manager.download_non_steam_games_grid(local_grid_file_path, progress=progress, task_id=sync_id, grid_index=grid_index)
             
             # Ensure bar looks complete even if 0 files
             # Ensure bar looks complete even if 0 files
@@ -149,7 +193,8 @@ def _run_task_for_user(config, steam_path, steam_id: SteamId, progress):
             local_grid_file_path,
             non_steam_games,
             progress=progress,
-            task_id=down_task)
+            task_id=down_task,
+            grid_index=grid_index)
         
         # Ensure bar looks complete even if 0 files
         # Ensure bar looks complete even if 0 files
@@ -173,7 +218,11 @@ def _run_task_for_user(config, steam_path, steam_id: SteamId, progress):
                                 config['steamgriddb_api_key'],
                                 steam_id,
                                 progress=progress,
-                                task_id=img_task)
+                                task_id=img_task,
+                                max_workers=config.get('art_download_workers', DEFAULT_MAX_WORKERS),
+                                size_profiles=config.get('art_size_profiles'),
+                                codec_policy=CodecPolicy.from_config(config.get('art_codec')),
+                                grid_index=grid_index)
         
         # Ensure bar looks complete even if 0 files
         # Ensure bar looks complete even if 0 files
@@ -197,8 +246,9 @@ def _run_task_for_user(config, steam_path, steam_id: SteamId, progress):
             local_grid_file_path,
             non_steam_games,
             progress=progress,
-            task_id=up_task)
-        dropbox_manifest_file_manager.save_file(dropbox_manager.get_manifest())
+            task_id=up_task,
+            grid_index=grid_index)
+        dropbox_manifest_file_manager.save_manifest(dropbox_manager.get_manifest())
         dropbox_manager.upload_manifest()
         
          # Ensure bar looks complete even if 0 files
@@ -219,7 +269,7 @@ def _run_task_for_user(config, steam_path, steam_id: SteamId, progress):
     if sync_manager:
         sync_up_task = progress.add_task("☁️  Nextcloud: Syncing to cloud...", total=None)
         try:
-            sync_manager.upload_directory(local_grid_file_path, progress=progress, task_id=sync_up_task)
+            sync_manager.upload_directory(local_grid_file_path, progress=progress, task_id=sync_up_task, grid_index=grid_index)
             
              # Ensure bar looks complete even if 0 files
             final_total = None
@@ -238,6 +288,16 @@ def _run_task_for_user(config, steam_path, steam_id: SteamId, progress):
             progress.console.print(f"[red]Nextcloud upload error: {e}[/red]")
             progress.update(sync_up_task, description="[red]☁️  Nextcloud: Upload failed")
 
+    if dropbox_manager and config.get('dropbox_watch', False):
+        def on_change():
+            dropbox_manifest_file_manager.save_manifest(dropbox_manager.get_manifest())
+        return lambda stop_event: dropbox_manager.watch_remote_changes(local_grid_file_path,
+                                                                       non_steam_games,
+                                                                       grid_index=grid_index,
+                                                                       stop_event=stop_event,
+                                                                       on_change=on_change)
+    return None
+
 
 def _get_dropbox_manager(config, steam_id, dropbox_manifest, console):
     try:
@@ -254,5 +314,7 @@ def _get_dropbox_manager(config, steam_id, dropbox_manifest, console):
 
 
 if __name__ == "__main__":
+    # Needed for the image transcoding worker processes in frozen (PyInstaller) builds
+    multiprocessing.freeze_support()
     main()
 
@@ -0,0 +1,119 @@
+import os
+import argparse
+import sys
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from filemanagers.config_file_manager import ConfigFileManager
+from downloader.art_fingerprints import ArtFingerprints, get_processing_profile
+from downloader.constants import ASSET_SIZE_PROFILES, CODEC_ORIGINAL
+from downloader.image_downloader import (
+    STEAM_IMAGE_EXTENSIONS,
+    CodecPolicy,
+    ImageTranscodePool,
+    plan_image_output,
+    process_image
+)
+from steam.grid_directory_index import GridDirectoryIndex
+from steam.steam_image_downloader import ASSET_FILENAME_POSTFIXES
+from steam.steam_image_handler import extract_appid_and_postfix
+from steam.steam_directory_finder import get_grid_path, get_steam_ids
+from steam.steam_id import SteamId
+
+POSTFIX_ASSETS = {postfix: asset_type for asset_type, postfix in ASSET_FILENAME_POSTFIXES.items()}
+
+def reencode_folder(local_dir, codec_policy, size_profiles, fingerprints, transcoder, dry_run=False):
+    print(f"\nScanning local folder: {local_dir}")
+    if not os.path.exists(local_dir):
+        print("Local folder does not exist.")
+        return 0, 0
+
+    queued = 0
+    bytes_before = 0
+    targets = set()
+    with os.scandir(local_dir) as it:
+        entries = [entry for entry in it if entry.is_file()]
+    for entry in entries:
+        try:
+            appid, postfix, ext = extract_appid_and_postfix(entry.name)
+        except ValueError:
+            continue
+        asset_type = POSTFIX_ASSETS.get(postfix)
+        if asset_type is None or ext.lower() not in STEAM_IMAGE_EXTENSIONS:
+            continue
+
+        codec = codec_policy.for_asset(asset_type)
+        max_size = size_profiles.get(asset_type)
+        if fingerprints.matches(entry.path, get_processing_profile(max_size, codec)):
+            continue
+        try:
+            extension, needs_transcode = plan_image_output(entry.path, max_size, codec)
+        except Exception as e:
+            print(f"  -> Skipping unreadable {entry.name}: {e}")
+            continue
+        if not needs_transcode:
+            continue
+
+        file_path = os.path.join(local_dir, f"{appid}{postfix}{extension}")
+        # Leftover copies of one image with different extensions all map to the same target
+        if file_path in targets:
+            continue
+        targets.add(file_path)
+        print(f"  -> {entry.name} -> {os.path.basename(file_path)}")
+        queued += 1
+        bytes_before += entry.stat().st_size
+        if not dry_run:
+            process_image(entry.path, file_path, transcoder, max_size, codec, fingerprints)
+    return queued, bytes_before
+
+def folder_size(local_dir):
+    with os.scandir(local_dir) as it:
+        return sum(entry.stat().st_size for entry in it if entry.is_file())
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-encode existing grid art with the configured codec")
+    parser.add_argument("--codec", type=str, default=None, help="original, png, jpeg or webp (default: art_codec from the config)")
+    parser.add_argument("--quality", type=int, default=None, help="Quality for jpeg and webp")
+    parser.add_argument("--dry-run", action="store_true", help="Print actions without re-encoding")
+    args = parser.parse_args()
+
+    config_manager = ConfigFileManager()
+    config = config_manager.load_or_create_preferences() or {}
+
+    codec_config = config.get('art_codec')
+    if args.codec is not None:
+        codec_config = {'codec': args.codec}
+    if args.quality is not None:
+        if isinstance(codec_config, str):
+            codec_config = {'codec': codec_config}
+        codec_config = {**(codec_config or {}), 'quality': args.quality}
+    codec_policy = CodecPolicy.from_config(codec_config)
+    size_profiles = {**ASSET_SIZE_PROFILES, **(config.get('art_size_profiles') or {})}
+    if codec_policy.default[0] == CODEC_ORIGINAL and not codec_policy.overrides:
+        print("No codec configured, only images larger than their size profile are re-encoded.")
+
+    steam_id64s = str(config.get('steam_id', '*'))
+    if steam_id64s.strip() == '*':
+        steam_ids = get_steam_ids()
+    else:
+        steam_ids = [SteamId(steamid64=steam_id64.strip()) for steam_id64 in steam_id64s.split(',')]
+
+    fingerprints = ArtFingerprints.load()
+    for steam_id in steam_ids:
+        print(f"\nProcessing Steam ID: {steam_id.get_steamid()}")
+        local_path = get_grid_path(steam_id)
+        with ImageTranscodePool() as transcoder:
+            queued, bytes_before = reencode_folder(local_path, codec_policy, size_profiles,
+                                                   fingerprints, transcoder, args.dry_run)
+        if queued and not args.dry_run:
+            print(f"Re-encoded {queued} images, folder is now {folder_size(local_path) / 2**20:.1f} MiB "
+                  f"({bytes_before / 2**20:.1f} MiB of originals replaced)")
+        else:
+            print(f"{queued} images to re-encode")
+        grid_index = GridDirectoryIndex(local_path)
+        fingerprints.retain(local_path, [grid_index.get_path(grid_file.filename) for grid_file in grid_index.files()])
+        fingerprints.save()
+
+if __name__ == "__main__":
+    main()
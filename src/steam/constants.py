@@ -1,4 +1,31 @@
 import os
 
 
-SHORTCUTS_VDF_PATH = os.path.join('userdata', '{user_id}', 'config', 'shortcuts.vdf')
\ No newline at end of file
+SHORTCUTS_VDF_PATH = os.path.join('userdata', '{user_id}', 'config', 'shortcuts.vdf')
+LIBRARY_CACHE_PATH = os.path.join('appcache', 'librarycache')
+APPINFO_VDF_PATH = os.path.join('appcache', 'appinfo.vdf')
+
+# Asset types fetched for a Steam game, plus the SteamGridDB game lookup itself
+ART_GAME = 'game'
+ART_GRID = 'grid'
+ART_HORIZONTAL = 'horizontal'
+ART_HERO = 'hero'
+ART_LOGO = 'logo'
+
+# Bit flags used for compact per-app asset sets
+ART_FLAGS = {
+    ART_GRID: 1,
+    ART_HORIZONTAL: 2,
+    ART_HERO: 4,
+    ART_LOGO: 8,
+}
+
+# A known miss is checked again after RECHECK_BASE seconds, doubling with every
+# further miss up to RECHECK_MAX.
+MISSING_ART_RECHECK_BASE = 24 * 60 * 60
+MISSING_ART_RECHECK_MAX = 90 * 24 * 60 * 60
+
+# How long a Steam CDN probe for the official 600x900 grid is trusted. Official art is
+# rarely removed, but games without it often get it later.
+VERTICAL_GRID_POSITIVE_TTL = 180 * 24 * 60 * 60
+VERTICAL_GRID_NEGATIVE_TTL = 7 * 24 * 60 * 60
@@ -0,0 +1,142 @@
+import os
+import threading
+
+from collections import namedtuple
+
+from steam.steam_image_handler import extract_appid_and_postfix
+
+
+# inode comes from DirEntry.stat() for scanned files, which is always 0 on Windows, while files
+# re-stat'ed by update() get the real one. Don't compare it across the two, e.g. in cache signatures.
+GridFile = namedtuple('GridFile', ['filename', 'extension', 'size', 'mtime_ns', 'ctime_ns', 'inode'])
+
+# Suffix of files still being written by a download or transcode
+IN_PROGRESS_SUFFIX = '.part'
+
+
+class GridDirectoryIndex:
+    """
+    In-memory index of a grid folder, built with a single os.scandir pass and updated
+    incrementally by every phase that writes or deletes files in it, so no phase has to
+    list or stat the folder again.
+    Art files are indexed as appid -> postfix -> {filename: GridFile}, where the postfix
+    is the asset suffix from the filename ('' horizontal, 'p' vertical, '_hero', '_logo').
+    An asset can have more than one file when it was stored with different extensions.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._files = {}
+        self._assets = {}
+        self._lock = threading.Lock()
+        self.refresh()
+
+
+    def refresh(self):
+        files = []
+        try:
+            with os.scandir(self.path) as it:
+                for entry in it:
+                    if entry.name.endswith(IN_PROGRESS_SUFFIX) or not entry.is_file():
+                        continue
+                    files.append(_grid_file(entry.name, entry.stat()))
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self._files = {}
+            self._assets = {}
+            for grid_file in files:
+                self._add(grid_file)
+
+
+    def files(self):
+        with self._lock:
+            return list(self._files.values())
+
+
+    def get_file(self, filename):
+        with self._lock:
+            return self._files.get(filename)
+
+
+    def get_path(self, filename):
+        return os.path.join(self.path, filename)
+
+
+    def get_appids(self, postfix=None):
+        """
+        Returns:
+            set: Appids with any art, or only with art for the given postfix.
+        """
+        with self._lock:
+            if postfix is None:
+                return set(self._assets)
+            return {appid for appid, assets in self._assets.items() if assets.get(postfix)}
+
+
+    def find(self, appid, postfix):
+        """
+        Returns:
+            list: GridFiles stored for the asset, one per extension.
+        """
+        with self._lock:
+            return list(self._assets.get(appid, {}).get(postfix, {}).values())
+
+
+    def update(self, filename):
+        """Re-stat a single file after it was written, or drop it if it is gone."""
+        try:
+            stat = os.stat(self.get_path(filename))
+        except FileNotFoundError:
+            self.discard(filename)
+            return None
+        grid_file = _grid_file(filename, stat)
+        with self._lock:
+            self._discard(filename)
+            self._add(grid_file)
+        return grid_file
+
+
+    def remove(self, filename):
+        """Delete a file from disk and from the index."""
+        try:
+            os.remove(self.get_path(filename))
+        finally:
+            self.discard(filename)
+
+
+    def discard(self, filename):
+        with self._lock:
+            self._discard(filename)
+
+
+    def _add(self, grid_file):
+        self._files[grid_file.filename] = grid_file
+        try:
+            appid, postfix, _ = extract_appid_and_postfix(grid_file.filename)
+        except ValueError:
+            return
+        self._assets.setdefault(appid, {}).setdefault(postfix, {})[grid_file.filename] = grid_file
+
+
+    def _discard(self, filename):
+        if self._files.pop(filename, None) is None:
+            return
+        try:
+            appid, postfix, _ = extract_appid_and_postfix(filename)
+        except ValueError:
+            return
+        assets = self._assets.get(appid, {})
+        assets.get(postfix, {}).pop(filename, None)
+        if not assets.get(postfix):
+            assets.pop(postfix, None)
+        if not assets:
+            self._assets.pop(appid, None)
+
+
+def _grid_file(filename, stat):
+    return GridFile(filename,
+                    os.path.splitext(filename)[1],
+                    stat.st_size,
+                    stat.st_mtime_ns,
+                    stat.st_ctime_ns,
+                    stat.st_ino)
@@ -0,0 +1,54 @@
+import threading
+import time
+
+from data.app_data import AppData
+from steam.constants import MISSING_ART_RECHECK_BASE, MISSING_ART_RECHECK_MAX
+
+
+class MissingArtCache:
+    """
+    Remembers appids and asset types that had no art upstream so later runs can skip them.
+    Each miss pushes the next check back exponentially; a hit forgets the entry.
+    Entries are stored as {appid: {asset_type: [misses, next_check]}}.
+    """
+    FILE_NAME = 'missing_art.json'
+
+    def __init__(self, entries=None):
+        self.entries = entries if entries is not None else {}
+        self._lock = threading.Lock()
+
+
+    @classmethod
+    def load(cls):
+        return cls(AppData.read_json_from_file(cls.FILE_NAME, dict))
+
+
+    def save(self):
+        with self._lock:
+            AppData.save_json_to_file(self.FILE_NAME, self.entries, dict)
+
+
+    def should_check(self, appid, asset_type, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self.entries.get(appid, {}).get(asset_type)
+        return entry is None or entry[1] <= now
+
+
+    def record_miss(self, appid, asset_type, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            assets = self.entries.setdefault(appid, {})
+            misses = assets.get(asset_type, [0, 0])[0] + 1
+            delay = min(MISSING_ART_RECHECK_BASE * 2 ** (misses - 1), MISSING_ART_RECHECK_MAX)
+            assets[asset_type] = [misses, int(now + delay)]
+
+
+    def record_hit(self, appid, asset_type):
+        with self._lock:
+            assets = self.entries.get(appid)
+            if assets is None:
+                return
+            assets.pop(asset_type, None)
+            if not assets:
+                del self.entries[appid]
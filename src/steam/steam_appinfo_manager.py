@@ -0,0 +1,152 @@
+import os
+import struct
+
+from data.app_data import AppData
+from steam.constants import APPINFO_VDF_PATH, ART_FLAGS, ART_GRID, ART_HERO, ART_HORIZONTAL, ART_LOGO
+
+
+APPINFO_CACHE_FILE_NAME = 'appinfo_library_assets.json'
+
+APPINFO_MAGIC_V27 = 0x07564427
+APPINFO_MAGIC_V28 = 0x07564428 # Adds a SHA-1 of the binary data to each entry
+APPINFO_MAGIC_V29 = 0x07564429 # Keys are indexes into a string table at the end of the file
+
+# Keys under appinfo/common/library_assets (or library_assets_full) and the art they stand for
+LIBRARY_ASSET_KEYS = {
+    'library_capsule': ART_FLAGS[ART_GRID],
+    'library_header': ART_FLAGS[ART_HORIZONTAL],
+    'library_hero': ART_FLAGS[ART_HERO],
+    'library_logo': ART_FLAGS[ART_LOGO],
+}
+LIBRARY_ASSET_PARENTS = ('library_assets', 'library_assets_full')
+
+# Binary KeyValues type markers
+KV_MAP = 0x00
+KV_STRING = 0x01
+KV_INT32 = 0x02
+KV_FLOAT32 = 0x03
+KV_POINTER = 0x04
+KV_WIDESTRING = 0x05
+KV_COLOR = 0x06
+KV_UINT64 = 0x07
+KV_MAP_END = 0x08
+KV_INT64 = 0x0A
+KV_MAP_END_ALT = 0x0B
+KV_FIXED_SIZES = {KV_INT32: 4, KV_FLOAT32: 4, KV_POINTER: 4, KV_COLOR: 4, KV_UINT64: 8, KV_INT64: 8}
+
+
+def get_appinfo_vdf_path(steam_dir):
+    return os.path.join(steam_dir, APPINFO_VDF_PATH)
+
+
+def load_appinfo_library_assets(steam_dir):
+    """
+    Get the official library assets of every app known to the Steam client.
+    The result is cached and only rebuilt when appinfo.vdf changes.
+
+    Returns:
+        dict: Mapping of appid (str) to ART_FLAGS bits. Apps without any library
+              assets map to 0, apps missing from appinfo.vdf are absent.
+    """
+    file_path = get_appinfo_vdf_path(steam_dir)
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return {}
+
+    cached = AppData.read_json_from_file(APPINFO_CACHE_FILE_NAME, dict)
+    if cached.get('mtime_ns') == stat.st_mtime_ns and cached.get('size') == stat.st_size:
+        return cached.get('assets', {})
+
+    try:
+        assets = parse_appinfo_library_assets(file_path)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"Error parsing {file_path}: {e}")
+        return {}
+    AppData.save_json_to_file(APPINFO_CACHE_FILE_NAME,
+                              {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'assets': assets},
+                              dict)
+    return assets
+
+
+def parse_appinfo_library_assets(file_path):
+    """
+    Stream through a binary appinfo.vdf, one app entry at a time, and collect
+    which library assets each app declares.
+    """
+    assets = {}
+    with open(file_path, 'rb') as f:
+        magic, _universe = struct.unpack('<II', f.read(8))
+        if magic not in (APPINFO_MAGIC_V27, APPINFO_MAGIC_V28, APPINFO_MAGIC_V29):
+            raise ValueError(f"Unsupported appinfo.vdf version: {magic:#x}")
+
+        key_table = None
+        if magic == APPINFO_MAGIC_V29:
+            string_table_offset, = struct.unpack('<q', f.read(8))
+            entries_offset = f.tell()
+            key_table = _read_string_table(f, string_table_offset)
+            f.seek(entries_offset)
+
+        # info_state, last_updated, access_token, sha1, change_number [, binary sha1]
+        entry_header_size = 40 if magic == APPINFO_MAGIC_V27 else 60
+
+        while True:
+            appid, = struct.unpack('<I', f.read(4))
+            if appid == 0:
+                break
+            size, = struct.unpack('<I', f.read(4))
+            entry = f.read(size)
+            if len(entry) != size:
+                raise ValueError(f"Truncated entry for appid {appid}")
+            assets[str(appid)] = _scan_library_assets(entry, entry_header_size, key_table)
+    return assets
+
+
+def _read_string_table(f, offset):
+    f.seek(offset)
+    count, = struct.unpack('<I', f.read(4))
+    strings = f.read().split(b'\0')
+    return [s.decode('utf-8', 'replace') for s in strings[:count]]
+
+
+def _scan_library_assets(data, pos, key_table):
+    """
+    Walk the binary KeyValues of one app, skipping every value, and return the
+    ART_FLAGS bits for the keys found under common/library_assets.
+    """
+    flags = 0
+    path = []
+    end = len(data)
+    while pos < end:
+        value_type = data[pos]
+        pos += 1
+        if value_type in (KV_MAP_END, KV_MAP_END_ALT):
+            if not path:
+                break
+            path.pop()
+            continue
+
+        if key_table is None:
+            key_end = data.index(b'\0', pos)
+            key = data[pos:key_end].decode('utf-8', 'replace')
+            pos = key_end + 1
+        else:
+            key = key_table[struct.unpack_from('<I', data, pos)[0]]
+            pos += 4
+
+        if len(path) >= 2 and path[-2] == 'common' and path[-1] in LIBRARY_ASSET_PARENTS:
+            flags |= LIBRARY_ASSET_KEYS.get(key, 0)
+
+        if value_type == KV_MAP:
+            path.append(key)
+        elif value_type == KV_STRING:
+            pos = data.index(b'\0', pos) + 1
+        elif value_type == KV_WIDESTRING:
+            while data[pos:pos + 2] != b'\0\0':
+                pos += 2
+            pos += 2
+        elif value_type in KV_FIXED_SIZES:
+            pos += KV_FIXED_SIZES[value_type]
+        else:
+            raise ValueError(f"Unknown KeyValues type {value_type:#x}")
+    return flags
@@ -1,6 +1,7 @@
 import os
 import sys
 
+from steam.constants import LIBRARY_CACHE_PATH
 from steam.steam_id import SteamId
 
 
@@ -61,6 +62,12 @@ def get_grid_path(steam_id: SteamId):
     return os.path.join(steam_path, *grid_path)
 
 
+def get_library_cache_path(steam_path=None):
+    if steam_path is None:
+        steam_path = get_steam_path()
+    return os.path.join(steam_path, LIBRARY_CACHE_PATH)
+
+
 if __name__ == "__main__":
     print("Finding path to Steam.")
     # If the script is executed directly, call the main function
@@ -1,89 +1,221 @@
 import argparse
+import concurrent.futures
 import os
-import time
 
 
-from api_proxies.steam_api_proxy import get_owned_games, has_600x900_grid_image
+from api_proxies.constants import DEFAULT_MAX_WORKERS
+from api_proxies.steam_api_proxy import (
+    get_owned_games,
+    has_600x900_grid_image,
+    probe_600x900_grid_images
+)
 from api_proxies.steamgriddb_api_proxy import (
     get_gameid_from_steam_appid,
     get_grid_url_from_gameid,
-    get_hero_url_from_gameid, get_logo_url_from_gameid
+    get_grid_urls_from_steam_appids,
+    get_hero_url_from_gameid, get_logo_url_from_gameid,
+    get_hero_urls_from_steam_appids, get_logo_urls_from_steam_appids,
+    get_response_cache
 )
-from data.app_data import AppData
-from downloader.image_downloader import save_image_as_png
+from downloader.art_fingerprints import ArtFingerprints
+from downloader.constants import ASSET_SIZE_PROFILES
+from downloader.image_downloader import CodecPolicy, ImageTranscodePool, save_image
+from steam.constants import ART_FLAGS, ART_GAME, ART_GRID, ART_HERO, ART_HORIZONTAL, ART_LOGO
+from steam.grid_directory_index import GridDirectoryIndex
+from steam.missing_art_cache import MissingArtCache
+from steam.steam_appinfo_manager import load_appinfo_library_assets
 from steam.steam_directory_finder import (
     get_steam_path,
     get_grid_path
 )
 from steam.steam_id import SteamId
+from steam.steam_library_cache import index_library_cache
+from steam.vertical_grid_cache import VerticalGridCache
+
+
+ASSET_FILENAME_POSTFIXES = {
+    ART_GRID: 'p',
+    ART_HORIZONTAL: '',
+    ART_HERO: '_hero',
+    ART_LOGO: '_logo',
+}
 
+ASSET_BATCH_LOOKUPS = {
+    ART_GRID: get_grid_urls_from_steam_appids,
+    ART_HORIZONTAL: lambda api_key, appids: get_grid_urls_from_steam_appids(api_key, appids, dimensions='920x430,460x215'),
+    ART_HERO: get_hero_urls_from_steam_appids,
+    ART_LOGO: get_logo_urls_from_steam_appids,
+}
 
-CACHE_FILE_NAME = 'games_with_vertical_grids.json'
 
-def download_missing_images(steam_api_key, steamgriddb_api_key, steam_id: SteamId, skip_if_exists=True, progress=None, task_id=None):
+def download_missing_images(steam_api_key, steamgriddb_api_key, steam_id: SteamId, skip_if_exists=True, progress=None, task_id=None, max_workers=DEFAULT_MAX_WORKERS, size_profiles=None, codec_policy=None, grid_index=None):
     owned_games = get_owned_games(steam_api_key, steam_id)
     steam_path = get_steam_path()
     grid_path = get_grid_path(steam_id)
     steam_grid_path = os.path.join(steam_path, grid_path)
     if not os.path.exists(steam_grid_path):
         os.makedirs(steam_grid_path)
-    existing_grid_images = get_appids_with_custom_images(steam_grid_path)
-    steam_games_with_vertical_grid_images = get_steam_games_with_vertical_grids()
+    if grid_index is None:
+        grid_index = GridDirectoryIndex(steam_grid_path)
+    existing_grid_images = get_appids_with_custom_images(grid_index)
+    vertical_grid_cache = VerticalGridCache.load()
+    missing_art = MissingArtCache.load()
+    fingerprints = ArtFingerprints.load()
+    size_profiles = {**ASSET_SIZE_PROFILES, **(size_profiles or {})}
+    codec_policy = codec_policy or CodecPolicy()
     if progress and task_id:
         progress.update(task_id, total=len(owned_games))
 
-    for game in owned_games:
-        appid = str(game['appid'])
-        download_missing_images_for_game(steamgriddb_api_key,
-                                         appid,
-                                         steam_grid_path,
-                                         existing_grid_images,
-                                         steam_games_with_vertical_grid_images,
-                                         skip_if_exists)
-        if progress and task_id:
-            progress.update(task_id, advance=1)
-    save_steam_games_with_vertical_grids(steam_games_with_vertical_grid_images)
+    # Games whose vertical grid the Steam client already cached locally need no requests at all
+    library_cache = index_library_cache(steam_path)
+    appids = [str(game['appid']) for game in owned_games]
+    appids_to_fetch = [appid for appid in appids
+                       if ART_GRID not in library_cache.get(appid, ())
+                       and not (skip_if_exists and appid in existing_grid_images)
+                       and _should_look_up_art(appid, missing_art)]
+
+    # appinfo.vdf tells us which apps ship an official library capsule without any requests
+    appinfo_assets = load_appinfo_library_assets(steam_path)
+    for appid in appids_to_fetch:
+        if appid in appinfo_assets and vertical_grid_cache.get(appid) is None:
+            vertical_grid_cache.set(appid, appinfo_assets[appid] & ART_FLAGS[ART_GRID])
+
+    # Probe the Steam CDN up front for every game that could need art and isn't cached
+    appids_to_probe = [appid for appid in appids_to_fetch if vertical_grid_cache.get(appid) is None]
+    for appid, has_grid in probe_600x900_grid_images(appids_to_probe, max_workers).items():
+        if has_grid is not None:
+            vertical_grid_cache.set(appid, has_grid)
+
+    # Everything without an official vertical grid is looked up on SteamGridDB in batches
+    appids_needing_art = [appid for appid in appids_to_fetch if not vertical_grid_cache.get(appid)]
+    if progress and task_id:
+        progress.update(task_id, advance=len(appids) - len(appids_needing_art))
+    art_urls = look_up_art_urls(steamgriddb_api_key, appids_needing_art, missing_art)
+
+    # Requests are paced by the per-host token buckets in api_proxies.rate_limiter,
+    # so the worker count only bounds how many downloads are in flight at once.
+    # Images that need transcoding are handed to worker processes.
+    written_paths = []
+    with ImageTranscodePool() as transcoder, \
+         concurrent.futures.ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(download_art_for_game,
+                                   appid,
+                                   art_urls.get(appid, {}),
+                                   steam_grid_path,
+                                   transcoder,
+                                   size_profiles,
+                                   fingerprints,
+                                   codec_policy) for appid in appids_needing_art]
+        for future in concurrent.futures.as_completed(futures):
+            written_paths.extend(future.result())
+            if progress and task_id:
+                progress.update(task_id, advance=1)
+    # Transcodes have all finished once the pool is closed
+    for file_path in written_paths:
+        grid_index.update(os.path.basename(file_path))
+    vertical_grid_cache.save()
+    missing_art.save()
+    get_response_cache().flush()
+    fingerprints.retain(steam_grid_path, [grid_index.get_path(grid_file.filename) for grid_file in grid_index.files()])
+    fingerprints.save()
 
 
-def get_appids_with_custom_images(path):
-    existing_grid_images = set()
-    with os.scandir(path) as it:
-        for entry in it:
-            # Vertical grid filenames end in p
-            if 'p.' in entry.name: 
-                entry_name = entry.name.split('p')[0]
-                existing_grid_images.add(entry_name)
-    return existing_grid_images
+def _should_look_up_art(appid, missing_art):
+    # TODO: ivestigate why VRX_Player_Steam_Edition causes issues appid: 844880
+    if appid == '844880':
+        return False
+    # Only a missing game skips the lookup, each asset's own backoff is checked when it is looked up
+    return missing_art.should_check(appid, ART_GAME)
 
 
-def get_steam_games_with_vertical_grids():
-    return AppData.read_json_from_file(CACHE_FILE_NAME, set)
+def look_up_art_urls(steamgriddb_api_key, appids, missing_art):
+    """
+    Find SteamGridDB art for many games with the batched platform endpoints,
+    recording hits and misses per asset type.
 
+    Returns:
+        dict: Mapping of appid to {asset_type: url} for the art that was found.
+    """
+    art_urls = {appid: {} for appid in appids}
 
-def save_steam_games_with_vertical_grids(games):
-    AppData.save_json_to_file(CACHE_FILE_NAME, games, list)
+    def look_up(asset_type):
+        wanted = [appid for appid in appids if missing_art.should_check(appid, asset_type)]
+        try:
+            return asset_type, ASSET_BATCH_LOOKUPS[asset_type](steamgriddb_api_key, wanted)
+        except Exception as e:
+            print(f"An exception occurred looking up {asset_type} images on SteamGridDB: {e}")
+            return asset_type, {}
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=len(ASSET_BATCH_LOOKUPS)) as executor:
+        for asset_type, urls in executor.map(look_up, ASSET_BATCH_LOOKUPS):
+            for appid, url in urls.items():
+                if url is None:
+                    missing_art.record_miss(appid, asset_type)
+                else:
+                    missing_art.record_hit(appid, asset_type)
+                    art_urls[appid][asset_type] = url
+    return art_urls
+
+
+def download_art_for_game(appid, urls, steam_grid_path, transcoder=None, size_profiles=ASSET_SIZE_PROFILES, fingerprints=None, codec_policy=None):
+    """
+    Returns:
+        list: Paths of the images written, some may still be in the transcoder.
+    """
+    codec_policy = codec_policy or CodecPolicy()
+    written_paths = []
+    for asset_type, url in urls.items():
+        file_path = download_image(url,
+                                   steam_grid_path,
+                                   f"{appid}{ASSET_FILENAME_POSTFIXES[asset_type]}",
+                                   transcoder,
+                                   size_profiles.get(asset_type),
+                                   fingerprints,
+                                   codec_policy.for_asset(asset_type))
+        if file_path is not None:
+            written_paths.append(file_path)
+    return written_paths
+
+
+def get_appids_with_custom_images(grid_index: GridDirectoryIndex):
+    return grid_index.get_appids(ASSET_FILENAME_POSTFIXES[ART_GRID])
 
 
 def download_missing_images_for_game(steamgriddb_api_key,
                                      appid, steam_grid_path,
                                      existing_grid_images,
-                                     steam_games_with_vertical_grid_images,
-                                     skip_if_exists=True):
-    # TODO: ivestigate why VRX_Player_Steam_Edition causes issues appid: 844880
-    if appid == '844880':
-        return
+                                     vertical_grid_cache,
+                                     skip_if_exists=True,
+                                     missing_art=None):
+    if missing_art is None:
+        missing_art = MissingArtCache()
     try:
         if skip_if_exists and appid in existing_grid_images:
             return
-        if appid in steam_games_with_vertical_grid_images or has_600x900_grid_image(appid):
-            steam_games_with_vertical_grid_images.add(appid)
+        if not _should_look_up_art(appid, missing_art):
+            return
+        has_grid = vertical_grid_cache.get(appid)
+        if has_grid is None:
+            has_grid = has_600x900_grid_image(appid)
+            if has_grid is not None:
+                vertical_grid_cache.set(appid, has_grid)
+        if has_grid:
             return
-        time.sleep(0.1)
         game_id = get_gameid_from_steam_appid(steamgriddb_api_key, appid)
-        get_vertical_image(steamgriddb_api_key, game_id, steam_grid_path, appid)
-        get_horizontal_image(steamgriddb_api_key, game_id, steam_grid_path, appid)
-        get_hero_image(steamgriddb_api_key, game_id, steam_grid_path, appid)
-        get_logo_image(steamgriddb_api_key, game_id, steam_grid_path, appid)
+        if game_id is None:
+            missing_art.record_miss(appid, ART_GAME)
+            return
+        missing_art.record_hit(appid, ART_GAME)
+        for asset_type, get_image in ((ART_GRID, get_vertical_image),
+                                      (ART_HORIZONTAL, get_horizontal_image),
+                                      (ART_HERO, get_hero_image),
+                                      (ART_LOGO, get_logo_image)):
+            if not missing_art.should_check(appid, asset_type):
+                continue
+            if get_image(steamgriddb_api_key, game_id, steam_grid_path, appid):
+                missing_art.record_hit(appid, asset_type)
+            else:
+                missing_art.record_miss(appid, asset_type)
     except Exception as e:
         pass
         # print(f"An exception occurred getting images for Steam AppId {appid}: {e}")
@@ -91,31 +223,40 @@ def download_missing_images_for_game(steamgriddb_api_key,
 
 def get_logo_image(steamgriddb_api_key, gameid, steam_grid_path, appid):
     url = get_logo_url_from_gameid(steamgriddb_api_key, gameid)
-    filename = str(appid) + "_logo.png"
-    download_image(url, steam_grid_path, filename)
+    if url is None:
+        return False
+    filename = str(appid) + "_logo"
+    return download_image(url, steam_grid_path, filename) is not None
 
 
 def get_hero_image(steamgriddb_api_key, gameid, steam_grid_path, appid):
     url = get_hero_url_from_gameid(steamgriddb_api_key, gameid)
-    filename = str(appid) + "_hero.png"
-    download_image(url, steam_grid_path, filename)
+    if url is None:
+        return False
+    filename = str(appid) + "_hero"
+    return download_image(url, steam_grid_path, filename) is not None
 
 
 def get_horizontal_image(steamgriddb_api_key, gameid, steam_grid_path, appid):
     url = get_grid_url_from_gameid(steamgriddb_api_key, gameid, dimensions='920x430,460x215')
-    filename = str(appid) + ".png"
-    download_image(url, steam_grid_path, filename)
+    if url is None:
+        return False
+    filename = str(appid)
+    return download_image(url, steam_grid_path, filename) is not None
 
 
 def get_vertical_image(steamgriddb_api_key, gameid, steam_grid_path, appid):
     url = get_grid_url_from_gameid(steamgriddb_api_key, gameid)
-    filename = str(appid) + "p.png"
-    download_image(url, steam_grid_path, filename)
+    if url is None:
+        return False
+    filename = str(appid) + "p"
+    return download_image(url, steam_grid_path, filename) is not None
 
 
-def download_image(url, steam_grid_path, image_name):
+def download_image(url, steam_grid_path, image_name, transcoder=None, max_size=None, fingerprints=None, codec=None):
+    # The extension is chosen from the downloaded image and the codec
     full_filepath = os.path.join(steam_grid_path, image_name)
-    save_image_as_png(url, full_filepath)
+    return save_image(url, full_filepath, transcoder, max_size, fingerprints, codec)
 
 
 if __name__ == "__main__":
@@ -136,4 +277,11 @@ if __name__ == "__main__":
     if args.steam_api_key is not None:
         download_missing_images(args.steam_api_key, args.steamgriddb_api_key, steam_id, args.skip_if_exists)
     if args.steam_app_id is not None:
-        download_missing_images_for_game(args.steamgriddb_api_key, steam_id, args.steam_app_id, args.skip_if_exists)
+        vertical_grid_cache = VerticalGridCache.load()
+        download_missing_images_for_game(args.steamgriddb_api_key,
+                                         str(args.steam_app_id),
+                                         get_grid_path(steam_id),
+                                         set(),
+                                         vertical_grid_cache,
+                                         args.skip_if_exists)
+        vertical_grid_cache.save()
@@ -32,3 +32,23 @@ def extract_appid_and_postfix(filename):
         return appid, postfix, extension
     else:
         raise ValueError(f"Filename {filename} doesn't match the expected pattern.")
+
+
+def extract_cloud_name_and_postfix(filename):
+    """
+    Extracts the cloud name (the SHA-256 of a shortcut's name) and the postfix from
+    the filename of non-Steam game art stored in the cloud.
+
+    Expected filename forms:
+      - <64 hex digits>.png       -> postfix: ""
+      - <64 hex digits>p.png      -> postfix: "p"
+      - <64 hex digits>_hero.png  -> postfix: "_hero"
+
+    Returns:
+        tuple: (cloud_name: str, postfix: str, extension: str)
+    """
+    m = re.match(r'^([0-9a-f]{64})(p|_[^.]+)?(\..+)$', filename)
+    if m:
+        return m.group(1), m.group(2) or "", m.group(3)
+    else:
+        raise ValueError(f"Filename {filename} doesn't match the expected pattern.")
@@ -0,0 +1,64 @@
+import os
+import re
+
+from steam.constants import ART_GRID, ART_HERO, ART_HORIZONTAL, ART_LOGO
+from steam.steam_directory_finder import get_library_cache_path
+
+
+# Art the Steam client caches locally for owned games, by file name stem
+LIBRARY_CACHE_ASSETS = {
+    'library_600x900': ART_GRID,
+    'library_capsule': ART_GRID,
+    'library_hero': ART_HERO,
+    'logo': ART_LOGO,
+    'header': ART_HORIZONTAL,
+}
+
+_ASSET_PATTERN = '|'.join(LIBRARY_CACHE_ASSETS)
+# Older clients: librarycache/<appid>_library_600x900.jpg
+_FLAT_FILE_PATTERN = re.compile(rf'^(\d+)_({_ASSET_PATTERN})(?:_2x)?\.(?:jpg|jpeg|png)$')
+# Newer clients: librarycache/<appid>/library_600x900.jpg, possibly one folder deeper
+_NESTED_FILE_PATTERN = re.compile(rf'^({_ASSET_PATTERN})(?:_2x)?\.(?:jpg|jpeg|png)$')
+
+
+def index_library_cache(steam_path=None):
+    """
+    Index the art the Steam client already has in appcache/librarycache.
+
+    Args:
+        steam_path (str, optional): Steam install folder. Looked up if not given.
+
+    Returns:
+        dict: Mapping of appid (str) to the set of asset types available locally.
+    """
+    library_cache_path = get_library_cache_path(steam_path)
+    index = {}
+    if not os.path.isdir(library_cache_path):
+        return index
+
+    with os.scandir(library_cache_path) as it:
+        for entry in it:
+            if entry.is_dir():
+                if entry.name.isdigit():
+                    assets = _scan_app_folder(entry.path)
+                    if assets:
+                        index.setdefault(entry.name, set()).update(assets)
+                continue
+            match = _FLAT_FILE_PATTERN.match(entry.name)
+            if match:
+                index.setdefault(match.group(1), set()).add(LIBRARY_CACHE_ASSETS[match.group(2)])
+    return index
+
+
+def _scan_app_folder(path, depth=0):
+    assets = set()
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir():
+                if depth == 0:
+                    assets.update(_scan_app_folder(entry.path, depth + 1))
+                continue
+            match = _NESTED_FILE_PATTERN.match(entry.name)
+            if match:
+                assets.add(LIBRARY_CACHE_ASSETS[match.group(1)])
+    return assets
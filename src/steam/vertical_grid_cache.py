@@ -0,0 +1,57 @@
+import threading
+import time
+
+from data.app_data import AppData
+from steam.constants import VERTICAL_GRID_NEGATIVE_TTL, VERTICAL_GRID_POSITIVE_TTL
+
+
+class VerticalGridCache:
+    """
+    Results of probing the Steam CDN for official 600x900 grid images.
+    Both positive and negative results are kept, each with its own expiry.
+    Entries are stored as {appid: [has_grid, checked_at]}.
+    """
+    FILE_NAME = 'steam_vertical_grids.json'
+    LEGACY_FILE_NAME = 'games_with_vertical_grids.json'
+
+    def __init__(self, entries=None):
+        self.entries = entries if entries is not None else {}
+        self._lock = threading.Lock()
+
+
+    @classmethod
+    def load(cls):
+        entries = AppData.read_json_from_file(cls.FILE_NAME, dict)
+        if not entries:
+            # The old cache only listed appids known to have a vertical grid
+            now = int(time.time())
+            entries = {appid: [True, now] for appid in AppData.read_json_from_file(cls.LEGACY_FILE_NAME, list)}
+        return cls(entries)
+
+
+    def save(self):
+        with self._lock:
+            AppData.save_json_to_file(self.FILE_NAME, self.entries, dict)
+
+
+    def get(self, appid, now=None):
+        """
+        Returns:
+            bool or None: The cached probe result, or None if unknown or expired.
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            entry = self.entries.get(appid)
+        if entry is None:
+            return None
+        has_grid, checked_at = entry
+        ttl = VERTICAL_GRID_POSITIVE_TTL if has_grid else VERTICAL_GRID_NEGATIVE_TTL
+        if checked_at + ttl <= now:
+            return None
+        return has_grid
+
+
+    def set(self, appid, has_grid, now=None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self.entries[appid] = [bool(has_grid), int(now)]
@@ -0,0 +1,40 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from downloader.art_fingerprints import ArtFingerprints
+
+class TestArtFingerprints(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.folder, '123p.png')
+        with open(self.file_path, 'wb') as f:
+            f.write(b'art')
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_changed_file_does_not_match(self):
+        fingerprints = ArtFingerprints()
+        fingerprints.record(self.file_path, '600x900')
+        self.assertTrue(fingerprints.matches(self.file_path, '600x900'))
+        self.assertFalse(fingerprints.matches(self.file_path, 'original'))
+        with open(self.file_path, 'ab') as f:
+            f.write(b'more')
+        self.assertFalse(fingerprints.matches(self.file_path, '600x900'))
+
+    def test_retain_forgets_deleted_files(self):
+        fingerprints = ArtFingerprints()
+        fingerprints.record(self.file_path, '600x900')
+        fingerprints.entries[os.path.join(self.folder, '456p.png')] = [1, 1, '600x900']
+        fingerprints.entries['/elsewhere/789p.png'] = [1, 1, '600x900']
+        fingerprints.retain(self.folder, [self.file_path])
+        self.assertEqual(set(fingerprints.entries), {self.file_path, '/elsewhere/789p.png'})
+
+if __name__ == '__main__':
+    unittest.main()
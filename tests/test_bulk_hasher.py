@@ -0,0 +1,55 @@
+import unittest
+import sys
+import os
+import hashlib
+import shutil
+import tempfile
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from cloud.bulk_hasher import hash_file, hash_files
+from cloud.constants import BULK_HASH_MIN_FILES, DROPBOX_CONTENT_HASH, DROPBOX_HASH_BLOCK_SIZE
+
+def reference_dropbox_hash(data):
+    blocks = [data[i:i + DROPBOX_HASH_BLOCK_SIZE] for i in range(0, len(data), DROPBOX_HASH_BLOCK_SIZE)]
+    return hashlib.sha256(b''.join(hashlib.sha256(block).digest() for block in blocks)).hexdigest()
+
+class TestBulkHasher(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _write(self, filename, data):
+        path = os.path.join(self.folder, filename)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_all_digests_in_one_pass(self):
+        # Spans more than one Dropbox block
+        data = os.urandom(DROPBOX_HASH_BLOCK_SIZE + 1234)
+        path = self._write('123_hero.png', data)
+        digests = hash_file(path, (DROPBOX_CONTENT_HASH, 'md5'))
+        self.assertEqual(digests[DROPBOX_CONTENT_HASH], reference_dropbox_hash(data))
+        self.assertEqual(digests['md5'], hashlib.md5(data).hexdigest())
+
+    def test_empty_file(self):
+        path = self._write('123p.png', b'')
+        self.assertEqual(hash_file(path)[DROPBOX_CONTENT_HASH], hashlib.sha256(b'').hexdigest())
+
+    def test_missing_file(self):
+        self.assertIsNone(hash_file(os.path.join(self.folder, 'missing.png')))
+
+    def test_many_files_across_processes(self):
+        contents = {self._write(f"{appid}p.png", os.urandom(100 + appid)): None for appid in range(BULK_HASH_MIN_FILES + 1)}
+        results = hash_files(contents, max_workers=2)
+        self.assertEqual(set(results), set(contents))
+        for path, digests in results.items():
+            with open(path, 'rb') as f:
+                self.assertEqual(digests[DROPBOX_CONTENT_HASH], reference_dropbox_hash(f.read()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from PIL import Image
+
+from downloader.art_fingerprints import get_processing_profile
+from downloader.image_downloader import CodecPolicy, plan_image_output, process_image
+from steam.constants import ART_GRID, ART_LOGO
+
+class TestCodecPolicy(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _image(self, name, size=(60, 90), fmt='PNG'):
+        path = os.path.join(self.temp_dir, name)
+        Image.new('RGB', size, (10, 20, 30)).save(path, format=fmt)
+        return path
+
+    def test_defaults_to_original(self):
+        self.assertEqual(CodecPolicy.from_config(None).for_asset(ART_GRID), ('original', 90))
+
+    def test_per_asset_overrides(self):
+        policy = CodecPolicy.from_config({'codec': 'webp', 'quality': 80,
+                                          'overrides': {ART_LOGO: 'png'}})
+        self.assertEqual(policy.for_asset(ART_GRID), ('webp', 80))
+        self.assertEqual(policy.for_asset(ART_LOGO), ('png', 80))
+
+    def test_rejects_unknown_codec(self):
+        with self.assertRaises(Exception):
+            CodecPolicy('gif')
+
+    def test_original_keeps_fitting_images(self):
+        path = self._image('1p.png')
+        self.assertEqual(plan_image_output(path, (600, 900)), ('.png', False))
+        self.assertEqual(plan_image_output(path, (30, 45)), ('.png', True))
+
+    def test_codec_reencodes(self):
+        path = self._image('1p.png')
+        self.assertEqual(plan_image_output(path, (600, 900), ('jpeg', 85)), ('.jpg', True))
+
+    def test_process_image_replaces_source(self):
+        source = self._image('1p.png')
+        destination = os.path.join(self.temp_dir, '1p.webp')
+        self.assertEqual(process_image(source, destination, codec=('webp', 80)), destination)
+        self.assertEqual(os.listdir(self.temp_dir), ['1p.webp'])
+
+    def test_process_image_in_place(self):
+        path = self._image('1p.jpg', size=(1200, 1800), fmt='JPEG')
+        process_image(path, path, max_size=(600, 900), codec=('jpeg', 80))
+        with Image.open(path) as image:
+            self.assertEqual(image.size, (600, 900))
+
+    def test_profile_includes_codec(self):
+        self.assertEqual(get_processing_profile((600, 900)), '600x900')
+        self.assertEqual(get_processing_profile((600, 900), ('webp', 80)), '600x900@webp:80')
+        self.assertEqual(get_processing_profile(None, ('png', 90)), 'original@png')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+import sys
+import os
+import shutil
+import tempfile
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from cloud.content_hash_cache import ContentHashCache, get_signature, get_stat_signature
+from steam.grid_directory_index import GridDirectoryIndex
+
+class TestContentHashCache(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        self.file_path = os.path.join(self.folder, '123p.png')
+        with open(self.file_path, 'wb') as f:
+            f.write(b'art')
+        self.calls = []
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def _compute(self, file_path):
+        self.calls.append(file_path)
+        return 'hash'
+
+    def test_unchanged_file_is_hashed_once(self):
+        cache = ContentHashCache()
+        self.assertEqual(cache.get_or_compute(self.file_path, self._compute), 'hash')
+        self.assertEqual(cache.get_or_compute(self.file_path, self._compute), 'hash')
+        self.assertEqual(self.calls, [self.file_path])
+
+    def test_changed_file_is_rehashed(self):
+        cache = ContentHashCache()
+        cache.get_or_compute(self.file_path, self._compute)
+        with open(self.file_path, 'ab') as f:
+            f.write(b'more')
+        self.assertIsNone(cache.get(self.file_path))
+        cache.get_or_compute(self.file_path, self._compute)
+        self.assertEqual(len(self.calls), 2)
+
+    def test_entries_survive_reload(self):
+        cache = ContentHashCache()
+        cache.set(self.file_path, 'hash')
+        reloaded = ContentHashCache({path: list(entry) for path, entry in cache.entries.items()})
+        self.assertEqual(reloaded.get(self.file_path, get_stat_signature(self.file_path)), 'hash')
+
+    def test_retain_forgets_deleted_files(self):
+        cache = ContentHashCache()
+        cache.set(self.file_path, 'hash')
+        cache.entries['/elsewhere/456p.png'] = [1, 1, 1, 'other']
+        cache.retain(self.folder, [])
+        self.assertNotIn(self.file_path, cache.entries)
+        # Files outside the folder are left alone
+        self.assertIn('/elsewhere/456p.png', cache.entries)
+
+    def test_scanned_and_stated_signatures_agree(self):
+        # The index scans with os.scandir, the sync workers stat with os.stat
+        cache = ContentHashCache()
+        # On Windows the scanned entry reports no inode
+        grid_file = GridDirectoryIndex(self.folder).get_file('123p.png')._replace(inode=0)
+        scanned_signature = get_signature(grid_file.size, grid_file.mtime_ns)
+        cache.get_or_compute(self.file_path, self._compute, scanned_signature)
+        cache.get_or_compute(self.file_path, self._compute)
+        # Stored from a re-stat, looked up from the scan
+        cache.set(self.file_path, 'hash')
+        self.assertEqual(cache.get(self.file_path, scanned_signature), 'hash')
+        self.assertEqual(self.calls, [self.file_path])
+
+    def test_legacy_entries_are_rehashed(self):
+        cache = ContentHashCache({self.file_path: [*get_stat_signature(self.file_path), 1, 'old']})
+        self.assertIsNone(cache.get(self.file_path))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+# Mock the Dropbox SDK and the session (and its token encryption) before importing the manager
+class ApiError(Exception):
+    pass
+
+dropbox_mock = MagicMock()
+dropbox_mock.exceptions.ApiError = ApiError
+sys.modules['dropbox'] = dropbox_mock
+sys.modules['dropbox.files'] = dropbox_mock.files
+sys.modules['dropbox.exceptions'] = dropbox_mock.exceptions
+sys.modules['requests'] = MagicMock()
+sys.modules['cloud.dropbox_session'] = MagicMock()
+
+from cloud.constants import DROPBOX_MANIFEST_MAX_JOURNAL
+from cloud.dropbox_manager import DropboxManager
+
+class TestDropboxManifestUpload(unittest.TestCase):
+    def setUp(self):
+        # Skip __init__, which downloads the remote manifest
+        self.manager = DropboxManager.__new__(DropboxManager)
+        self.dbx = MagicMock()
+        self.manager.session = MagicMock()
+        self.manager.session.get_client.return_value = self.dbx
+        self.manager.dropbox_manifest_path = '/1/manifest.json'
+        self.manager.dropbox_manifest_journal_path = '/1/manifest-journal'
+        self.manager.remote_manifest = {'/1/grid/10p.png': {'hash': 'a', 'timestamp': 1.0}}
+        self.manager.local_manifest = {'/1/grid/10p.png': {'hash': 'b', 'timestamp': 2.0}}
+        self.manager.manifest_journal = []
+
+    def test_failed_delta_upload_is_sent_again(self):
+        self.dbx.files_upload.side_effect = ApiError('insufficient space')
+        self.manager.upload_manifest()
+        self.assertEqual(self.manager.manifest_journal, [])
+        self.assertEqual(self.manager.remote_manifest['/1/grid/10p.png']['hash'], 'a')
+
+        # Once Dropbox accepts it, the same change goes out as a delta
+        self.dbx.files_upload.side_effect = None
+        self.manager.upload_manifest()
+        self.assertEqual(len(self.manager.manifest_journal), 1)
+        self.assertEqual(self.manager.remote_manifest['/1/grid/10p.png']['hash'], 'b')
+
+    def test_failed_compaction_keeps_journal(self):
+        journal = [f'{i:03d}.json' for i in range(DROPBOX_MANIFEST_MAX_JOURNAL)]
+        self.manager.manifest_journal = list(journal)
+        self.dbx.files_upload.side_effect = ApiError('insufficient space')
+        with patch.object(self.manager, '_delete_manifest_journal') as mock_delete:
+            self.manager.upload_manifest()
+        mock_delete.assert_not_called()
+        self.assertEqual(self.manager.manifest_journal, journal)
+        self.assertEqual(self.manager.remote_manifest['/1/grid/10p.png']['hash'], 'a')
+
+    def test_compaction_clears_journal(self):
+        self.manager.manifest_journal = [f'{i:03d}.json' for i in range(DROPBOX_MANIFEST_MAX_JOURNAL)]
+        with patch.object(self.manager, '_delete_manifest_journal') as mock_delete:
+            self.manager.upload_manifest()
+        mock_delete.assert_called_once()
+        self.assertEqual(self.manager.manifest_journal, [])
+        self.assertEqual(self.dbx.files_upload.call_args.args[1], '/1/manifest.json')
+
+if __name__ == '__main__':
+    unittest.main()
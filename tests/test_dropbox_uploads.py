@@ -0,0 +1,74 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import shutil
+import tempfile
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+# Mock the Dropbox SDK and the session (and its token encryption) before importing the manager
+class ApiError(Exception):
+    pass
+
+dropbox_mock = MagicMock()
+dropbox_mock.exceptions.ApiError = ApiError
+sys.modules['dropbox'] = dropbox_mock
+sys.modules['dropbox.files'] = dropbox_mock.files
+sys.modules['dropbox.exceptions'] = dropbox_mock.exceptions
+sys.modules['requests'] = MagicMock()
+sys.modules['cloud.dropbox_session'] = MagicMock()
+
+from cloud.dropbox_manager import DropboxManager
+
+class TestDropboxUploads(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+        for name in ('10p.png', '20p.png', '30p.png'):
+            with open(os.path.join(self.folder, name), 'wb') as f:
+                f.write(name.encode('utf-8'))
+
+        # Skip __init__, which downloads the remote manifest
+        self.manager = DropboxManager.__new__(DropboxManager)
+        self.manager.dropbox_folder_path = '/1/grid'
+        # 10p.png is up to date, 20p.png and 30p.png changed locally
+        self.manager.remote_manifest = {f'/1/grid/{name}': {'hash': 'old', 'timestamp': 5}
+                                        for name in ('10p.png', '20p.png', '30p.png')}
+        self.manager.local_manifest = {'/1/grid/10p.png': {'hash': 'old', 'timestamp': 5},
+                                       '/1/grid/20p.png': {'hash': 'new', 'timestamp': 10},
+                                       '/1/grid/30p.png': {'hash': 'new', 'timestamp': 10}}
+
+        self.dbx = MagicMock()
+        def start_session(chunk, close):
+            # 30p.png fails to upload
+            if chunk == b'30p.png':
+                raise ApiError('too_many_write_operations')
+            return MagicMock(session_id=chunk.decode('utf-8'))
+        self.dbx.files_upload_session_start.side_effect = start_session
+        self.dbx.files_upload_session_finish_batch_v2.side_effect = \
+            lambda batch: MagicMock(entries=[MagicMock(is_success=lambda: True) for _ in batch])
+
+        patch.object(self.manager, '_get_all_file_hashes_in_dropbox_folder', return_value={}).start()
+        patch.object(self.manager, '_calculate_dropbox_content_hash', return_value='new').start()
+        # Make the committed files readable by their Dropbox path
+        patch('cloud.dropbox_manager.CommitInfo', side_effect=lambda path, mode: path).start()
+        patch('cloud.dropbox_manager.UploadSessionFinishArg', side_effect=lambda cursor, commit: commit).start()
+        self.addCleanup(patch.stopall)
+
+    def tearDown(self):
+        shutil.rmtree(self.folder)
+
+    def test_only_uploaded_files_are_committed(self):
+        self.manager._upload_newer_files(self.dbx, self.folder, ['10p.png', '20p.png', '30p.png'], '/1/grid')
+
+        # The unchanged file is skipped, the failed one is left out of the batch
+        self.dbx.files_upload_session_finish_batch_v2.assert_called_once_with(['/1/grid/20p.png'])
+
+    def test_nothing_committed_when_up_to_date(self):
+        self.manager._upload_newer_files(self.dbx, self.folder, ['10p.png'], '/1/grid')
+        self.dbx.files_upload_session_start.assert_not_called()
+        self.dbx.files_upload_session_finish_batch_v2.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
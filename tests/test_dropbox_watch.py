@@ -0,0 +1,65 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+import threading
+import time
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+# Mock the Dropbox SDK and the session (and its token encryption) before importing the manager
+class ApiError(Exception):
+    pass
+
+dropbox_mock = MagicMock()
+dropbox_mock.exceptions.ApiError = ApiError
+sys.modules['dropbox'] = dropbox_mock
+sys.modules['dropbox.files'] = dropbox_mock.files
+sys.modules['dropbox.exceptions'] = dropbox_mock.exceptions
+sys.modules['requests'] = MagicMock()
+sys.modules['cloud.dropbox_session'] = MagicMock()
+
+from cloud.dropbox_manager import DropboxManager
+
+class TestDropboxWatch(unittest.TestCase):
+    def setUp(self):
+        # Skip __init__, which downloads the remote manifest
+        self.manager = DropboxManager.__new__(DropboxManager)
+        self.manager.dropbox_folder_path = '/1/grid'
+        self.manager.dropbox_folder_path_non_steam = '/1/grid-non-steam'
+        self.manager.dropbox_manifest_journal_path = '/1/manifest-journal'
+        self.manager._watch_lock = threading.Lock()
+        self.manager.hash_cache = MagicMock()
+        self.manager.listing_cache = MagicMock()
+        # Each folder's cursor is its path
+        self.manager.listing_cache.get_cursor.side_effect = lambda path: path
+        self.dbx = MagicMock()
+        self.manager.session = MagicMock()
+        self.manager.session.get_client.return_value = self.dbx
+
+        patch.object(self.manager, '_download_manifest', return_value={}).start()
+        patch.object(self.manager, '_get_all_file_hashes_in_dropbox_folder', return_value={}).start()
+        self.mock_pull = patch.object(self.manager, '_download_newer_files_for_category').start()
+        self.addCleanup(patch.stopall)
+
+    def test_manifest_journal_change_pulls_both_folders(self):
+        stop_event = threading.Event()
+        journal_changed = threading.Event()
+
+        def longpoll(cursor, timeout):
+            # Only the journal changes, e.g. the other machine wrote its manifest after the files
+            if cursor == '/1/manifest-journal' and not journal_changed.is_set():
+                journal_changed.set()
+                return MagicMock(changes=True, backoff=None)
+            time.sleep(0.01)
+            return MagicMock(changes=False, backoff=None)
+        self.dbx.files_list_folder_longpoll.side_effect = longpoll
+
+        self.manager.watch_remote_changes('/tmp/grid', grid_index=MagicMock(), stop_event=stop_event, on_change=stop_event.set)
+
+        pulled_folders = {call.args[2] for call in self.mock_pull.call_args_list}
+        self.assertEqual(pulled_folders, {'/1/grid', '/1/grid-non-steam'})
+
+if __name__ == '__main__':
+    unittest.main()
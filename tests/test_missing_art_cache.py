@@ -0,0 +1,43 @@
+import unittest
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from steam.constants import ART_GRID, ART_HERO, MISSING_ART_RECHECK_BASE, MISSING_ART_RECHECK_MAX
+from steam.missing_art_cache import MissingArtCache
+
+class TestMissingArtCache(unittest.TestCase):
+    def test_unknown_assets_are_checked(self):
+        cache = MissingArtCache()
+        self.assertTrue(cache.should_check('123', ART_GRID, now=0))
+
+    def test_recheck_interval_doubles_per_miss(self):
+        cache = MissingArtCache()
+        cache.record_miss('123', ART_GRID, now=0)
+        self.assertFalse(cache.should_check('123', ART_GRID, now=MISSING_ART_RECHECK_BASE - 1))
+        self.assertTrue(cache.should_check('123', ART_GRID, now=MISSING_ART_RECHECK_BASE))
+
+        cache.record_miss('123', ART_GRID, now=0)
+        self.assertFalse(cache.should_check('123', ART_GRID, now=2 * MISSING_ART_RECHECK_BASE - 1))
+        self.assertTrue(cache.should_check('123', ART_GRID, now=2 * MISSING_ART_RECHECK_BASE))
+
+        # Other asset types of the same appid are tracked separately
+        self.assertTrue(cache.should_check('123', ART_HERO, now=0))
+
+    def test_recheck_interval_is_capped(self):
+        cache = MissingArtCache()
+        for _ in range(50):
+            cache.record_miss('123', ART_GRID, now=0)
+        self.assertTrue(cache.should_check('123', ART_GRID, now=MISSING_ART_RECHECK_MAX))
+
+    def test_hit_clears_miss(self):
+        cache = MissingArtCache()
+        cache.record_miss('123', ART_GRID, now=0)
+        cache.record_hit('123', ART_GRID)
+        self.assertTrue(cache.should_check('123', ART_GRID, now=0))
+        self.assertEqual(cache.entries, {})
+
+if __name__ == '__main__':
+    unittest.main()
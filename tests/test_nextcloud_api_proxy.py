@@ -0,0 +1,142 @@
+import io
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+# Mock requests before importing modules that use it
+sys.modules['requests'] = MagicMock()
+
+from api_proxies.nextcloud_api_proxy import NextcloudApiProxy
+from api_proxies.nextcloud_collection_cache import NextcloudCollectionCache
+
+DAV_ROOT = '/remote.php/dav/files/user'
+
+def multistatus(*entries):
+    responses = []
+    for path, etag, mod_time in entries:
+        is_collection = path.endswith('/')
+        responses.append(f"""
+        <d:response>
+            <d:href>{DAV_ROOT}/{path}</d:href>
+            <d:propstat>
+                <d:prop>
+                    <d:getetag>"{etag}"</d:getetag>
+                    {'' if mod_time is None else f'<d:getlastmodified>{mod_time}</d:getlastmodified>'}
+                    <d:resourcetype>{'<d:collection/>' if is_collection else ''}</d:resourcetype>
+                </d:prop>
+                <d:status>HTTP/1.1 200 OK</d:status>
+            </d:propstat>
+        </d:response>""")
+    return f'<?xml version="1.0"?><d:multistatus xmlns:d="DAV:">{"".join(responses)}</d:multistatus>'.encode('utf-8')
+
+class TestNextcloudApiProxy(unittest.TestCase):
+    def setUp(self):
+        self.proxy = NextcloudApiProxy('https://cloud.example.com', 'user', 'password',
+                                       collection_cache=NextcloudCollectionCache())
+        self.proxy.transport = MagicMock()
+
+    def _respond(self, status_code, content=b''):
+        self.proxy.transport.request.return_value = MagicMock(status_code=status_code, raw=io.BytesIO(content))
+
+    def test_list_remote_files(self):
+        self._respond(207, multistatus(
+            ('SB/1/SteamGridSync/', 'folder', None),
+            ('SB/1/SteamGridSync/10p.png', 'a', 'Tue, 14 Nov 2023 22:13:20 GMT'),
+            ('SB/1/SteamGridSync/My%20Game.png', 'b', 'Tue, 14 Nov 2023 22:13:20 GMT'),
+        ))
+        self.assertEqual(self.proxy.list_remote_files('SB/1/SteamGridSync'),
+                         {'10p.png': 1700000000.0, 'My Game.png': 1700000000.0})
+
+    def test_requests_only_listing_properties(self):
+        self._respond(207, multistatus(('SB/1/SteamGridSync/', 'folder', None)))
+        self.proxy.list_remote_files('SB/1/SteamGridSync')
+        body = self.proxy.transport.request.call_args.kwargs['data']
+        for prop in ('getlastmodified', 'getetag', 'getcontentlength', 'resourcetype', 'oc:checksums'):
+            self.assertIn(prop, body)
+        self.assertTrue(self.proxy.transport.request.call_args.kwargs['stream'])
+
+    def test_file_properties(self):
+        content = multistatus(('SB/1/10p.png', 'a', 'Tue, 14 Nov 2023 22:13:20 GMT')).replace(
+            b'<d:getetag>', b'<d:getcontentlength>2048</d:getcontentlength>'
+                            b'<oc:checksums xmlns:oc="http://owncloud.org/ns"><oc:checksum>SHA1:abc</oc:checksum></oc:checksums>'
+                            b'<d:getetag>')
+        self._respond(207, content)
+        path, is_collection, props = next(self.proxy._propfind('SB/1/10p.png', '0'))
+        self.assertEqual((path, is_collection), ('', False))
+        self.assertEqual(props, {'mtime': 1700000000.0, 'etag': '"a"', 'size': 2048, 'checksums': 'SHA1:abc'})
+
+    def test_remote_file_modtime(self):
+        self._respond(207, multistatus(('SB/1/10p.png', 'a', 'Tue, 14 Nov 2023 22:13:20 GMT')))
+        self.assertEqual(self.proxy.get_remote_file_modtime('SB/1/10p.png'), 1700000000.0)
+        self._respond(404)
+        self.assertIsNone(self.proxy.get_remote_file_modtime('SB/1/10p.png'))
+
+    def test_missing_folder_is_empty(self):
+        self._respond(404)
+        self.assertEqual(self.proxy.list_remote_files('SB/1/SteamGridSync'), {})
+
+    def test_collection_etags(self):
+        self._respond(207, multistatus(
+            ('SB/1/', 'root', None),
+            ('SB/1/SteamGridSync/', 'grid', None),
+            ('SB/1/SteamShortcutGridSync/', 'shortcuts', None),
+            ('SB/1/manifest.json', 'file', 'Tue, 14 Nov 2023 22:13:20 GMT'),
+        ))
+        self.assertEqual(self.proxy.get_collection_etags('SB/1'),
+                         {'': '"root"', 'SteamGridSync': '"grid"', 'SteamShortcutGridSync': '"shortcuts"'})
+
+    def test_list_remote_tree(self):
+        self._respond(207, multistatus(
+            ('SB/1/', 'root', None),
+            ('SB/1/SteamGridSync/', 'grid', None),
+            ('SB/1/SteamGridSync/10p.png', 'a', 'Tue, 14 Nov 2023 22:13:20 GMT'),
+            ('SB/1/SteamShortcutGridSync/', 'shortcuts', None),
+        ))
+        tree = self.proxy.list_remote_tree('SB/1')
+        self.assertEqual(tree['SteamGridSync'], {'etag': '"grid"', 'files': {'10p.png': 1700000000.0}})
+        self.assertEqual(tree['SteamShortcutGridSync'], {'etag': '"shortcuts"', 'files': {}})
+
+    def test_list_remote_tree_without_depth_infinity(self):
+        self._respond(403)
+        self.assertIsNone(self.proxy.list_remote_tree('SB/1'))
+
+    def _mkcol_statuses(self, *statuses):
+        self.proxy.transport.request.side_effect = [MagicMock(status_code=status) for status in statuses]
+
+    def _requested_folders(self):
+        return [call.args[1].rpartition('/user/')[2] for call in self.proxy.transport.request.call_args_list]
+
+    def test_existing_folder_costs_one_request_then_none(self):
+        self._mkcol_statuses(405)
+        self.proxy.ensure_remote_folder('SB/1/SteamGridSync')
+        self.proxy.ensure_remote_folder('SB/1/SteamGridSync')
+        # Its parents are known to exist as well
+        self.proxy.ensure_remote_folder('SB/1')
+        self.assertEqual(self._requested_folders(), ['SB/1/SteamGridSync'])
+
+    def test_missing_parents_created_on_conflict(self):
+        self._mkcol_statuses(409, 409, 201, 201, 201)
+        self.proxy.ensure_remote_folder('SB/1/SteamGridSync')
+        self.assertEqual(self._requested_folders(), ['SB/1/SteamGridSync', 'SB/1', 'SB', 'SB/1', 'SB/1/SteamGridSync'])
+        self.assertTrue(self.proxy.collection_cache.contains(self.proxy.collection_server, 'SB/1/SteamGridSync'))
+
+    def test_failed_creation_not_cached(self):
+        self._mkcol_statuses(507)
+        with self.assertRaises(Exception):
+            self.proxy.ensure_remote_folder('SB/1')
+        self.assertFalse(self.proxy.collection_cache.contains(self.proxy.collection_server, 'SB/1'))
+
+    def test_upload_recreates_removed_folder(self):
+        self.proxy.collection_cache.add(self.proxy.collection_server, 'SB/1')
+        self.proxy.transport.put.side_effect = [MagicMock(status_code=409), MagicMock(status_code=201)]
+        self._mkcol_statuses(201)
+        self.proxy.upload_file(b'data', 'SB/1/10p.png')
+        self.assertEqual(self._requested_folders(), ['SB/1'])
+        self.assertEqual(self.proxy.transport.put.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,6 +9,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 's
 # Mock requests before importing modules that use it
 sys.modules['requests'] = MagicMock()
 
+from cloud.nextcloud_folder_cache import NextcloudFolderCache
 from cloud.nextcloud_manager import NextcloudManager
 
 class TestNextcloudSyncLogic(unittest.TestCase):
@@ -67,6 +68,20 @@ class TestNextcloudSyncLogic(unittest.TestCase):
         self.mock_api.download_file.assert_called_once()
         print("\n[Passed] test_download_standard_logic: Downloaded because local was older")
 
+    @patch('os.path.exists')
+    def test_download_uses_listed_mod_time(self, mock_exists):
+        # Setup: The folder listing already gave the remote mtime, local file is missing
+        mock_exists.return_value = False
+        self.mock_api.download_file.return_value = b"data"
+
+        with patch('builtins.open', unittest.mock.mock_open()), patch('os.makedirs'), patch('os.utime'):
+            self.manager.download_file(self.remote_file, self.local_file, remote_mod_time=1000)
+
+        # Assert
+        # No per-file PROPFIND, just the transfer
+        self.mock_api.get_remote_file_modtime.assert_not_called()
+        self.mock_api.download_file.assert_called_once()
+
     @patch('os.path.getmtime')
     @patch('os.path.getctime')
     def test_upload_logic_fix(self, mock_ctime, mock_mtime):
@@ -87,5 +102,61 @@ class TestNextcloudSyncLogic(unittest.TestCase):
         self.mock_api.upload_file.assert_called_once()
         print("\n[Passed] test_upload_logic_fix: Uploaded because local ctime was newer")
 
+    def test_listing_reused_while_etag_unchanged(self):
+        # Setup: The folder was listed before at etag "a"
+        folder_cache = NextcloudFolderCache('folders.json', {'base/grid': {'etag': '"a"', 'files': {'10p.png': 1000}}})
+        manager = NextcloudManager(self.mock_api, "base", folder_cache)
+        self.mock_api.get_collection_etags.return_value = {'': '"root"', 'grid': '"a"'}
+
+        # Action
+        files = manager.list_remote_files("grid")
+
+        # Assert
+        self.assertEqual(files, {'10p.png': 1000})
+        self.mock_api.list_remote_tree.assert_not_called()
+        self.mock_api.list_remote_files.assert_not_called()
+
+    @patch('data.app_data.AppData.save_json_to_file')
+    def test_changed_etag_refreshes_all_folders(self, mock_save):
+        # Setup: The folder changed since it was listed
+        folder_cache = NextcloudFolderCache('folders.json', {'base/grid': {'etag': '"a"', 'files': {'10p.png': 1000}}})
+        manager = NextcloudManager(self.mock_api, "base", folder_cache)
+        self.mock_api.get_collection_etags.return_value = {'': '"root"', 'grid': '"b"', 'shortcuts': '"c"'}
+        self.mock_api.list_remote_tree.return_value = {
+            '': {'etag': '"root"', 'files': {}},
+            'grid': {'etag': '"b"', 'files': {'10p.png': 2000}},
+            'shortcuts': {'etag': '"c"', 'files': {}},
+        }
+
+        # Action
+        files = manager.list_remote_files("grid")
+
+        # Assert
+        # The sibling folder is cached from the same request
+        self.assertEqual(files, {'10p.png': 2000})
+        self.assertEqual(folder_cache.get('base/shortcuts', '"c"'), {})
+        mock_save.assert_called_once()
+
+    @patch('data.app_data.AppData.save_json_to_file')
+    def test_etags_probed_once_per_run(self, mock_save):
+        # Setup: Nothing is cached yet
+        manager = NextcloudManager(self.mock_api, "base", NextcloudFolderCache('folders.json'))
+        self.mock_api.get_collection_etags.return_value = {'': '"root"', 'grid': '"a"', 'shortcuts': '"b"'}
+        self.mock_api.list_remote_tree.return_value = {
+            '': {'etag': '"root"', 'files': {}},
+            'grid': {'etag': '"a"', 'files': {'10p.png': 1000}},
+            'shortcuts': {'etag': '"b"', 'files': {}},
+        }
+
+        # Action
+        # Download then upload, each listing both folders
+        for _ in range(2):
+            manager.list_remote_files("grid")
+            manager.list_remote_files("shortcuts")
+
+        # Assert
+        self.mock_api.get_collection_etags.assert_called_once()
+        self.mock_api.list_remote_tree.assert_called_once()
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,55 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+# Mock requests before importing
+sys.modules['requests'] = MagicMock()
+
+from cloud.steam_grid_sync_manager import SteamGridSyncManager
+from cloud.constants import NON_STEAM_DIR
+
+CLOUD_NAME = 'a1' * 32
+OTHER_CLOUD_NAME = 'b2' * 32
+
+class TestNonSteamGridSync(unittest.TestCase):
+    def setUp(self):
+        self.mock_cloud_manager = MagicMock()
+        self.non_steam_games = {
+            '3000000000': {'AppName': 'Game', 'GridImageId': '3000000000', 'CloudName': CLOUD_NAME},
+        }
+        self.manager = SteamGridSyncManager(self.mock_cloud_manager, self.non_steam_games)
+        self.local_dir = "test_dir"
+
+    def test_downloads_only_matching_shortcut_art(self):
+        self.mock_cloud_manager.list_remote_files.return_value = {
+            f"{CLOUD_NAME}p.png": 1000,
+            f"{CLOUD_NAME}_hero.jpg": 2000,
+            f"{OTHER_CLOUD_NAME}p.png": 3000,
+            # Contains the cloud name but isn't art for it
+            f"old-{CLOUD_NAME}p.png": 4000,
+        }
+
+        with patch('concurrent.futures.ThreadPoolExecutor') as mock_executor, \
+             patch('concurrent.futures.as_completed', side_effect=lambda futures: iter(futures)):
+            instance_mock = MagicMock()
+            mock_executor.return_value.__enter__.return_value = instance_mock
+
+            def side_effect_submit(fn, *args, **kwargs):
+                fn(*args, **kwargs)
+                return MagicMock()
+            instance_mock.submit.side_effect = side_effect_submit
+
+            self.manager.download_non_steam_games_grid(self.local_dir)
+
+        downloads = sorted(call.args + (call.kwargs['remote_mod_time'],) for call in self.mock_cloud_manager.download_file.call_args_list)
+        self.assertEqual(downloads, [
+            (f"{NON_STEAM_DIR}/{CLOUD_NAME}_hero.jpg", os.path.join(self.local_dir, '3000000000_hero.jpg'), 2000),
+            (f"{NON_STEAM_DIR}/{CLOUD_NAME}p.png", os.path.join(self.local_dir, '3000000000p.png'), 1000),
+        ])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from api_proxies.rate_limiter import TokenBucket
+
+class TestTokenBucket(unittest.TestCase):
+    @patch('api_proxies.rate_limiter.time.sleep')
+    @patch('api_proxies.rate_limiter.time.monotonic')
+    def test_burst_then_wait(self, mock_monotonic, mock_sleep):
+        # Capacity of 2 at 1 token/s: two free requests, then the third waits ~1s
+        mock_monotonic.return_value = 100.0
+        bucket = TokenBucket(rate=1.0, capacity=2)
+
+        bucket.acquire()
+        bucket.acquire()
+        mock_sleep.assert_not_called()
+
+        bucket.acquire()
+        mock_sleep.assert_called_once()
+        self.assertAlmostEqual(mock_sleep.call_args[0][0], 1.0)
+
+    @patch('api_proxies.rate_limiter.time.sleep')
+    @patch('api_proxies.rate_limiter.time.monotonic')
+    def test_refill_over_time(self, mock_monotonic, mock_sleep):
+        mock_monotonic.return_value = 0.0
+        bucket = TokenBucket(rate=10.0, capacity=1)
+        bucket.acquire()
+
+        # 0.5s later the bucket has refilled (capped at capacity)
+        mock_monotonic.return_value = 0.5
+        bucket.acquire()
+        mock_sleep.assert_not_called()
+
+    @patch('api_proxies.rate_limiter.time.sleep')
+    def test_zero_rate_is_unlimited(self, mock_sleep):
+        bucket = TokenBucket(rate=0, capacity=1)
+        for _ in range(10):
+            bucket.acquire()
+        mock_sleep.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
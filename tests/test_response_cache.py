@@ -0,0 +1,105 @@
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import tempfile
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from api_proxies.response_cache import ResponseCache
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.temp_dir.name, 'cache.sqlite3')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    @patch('api_proxies.response_cache.time.time')
+    def test_entry_goes_stale_after_endpoint_ttl(self, mock_time):
+        mock_time.return_value = 1000
+        cache = ResponseCache(self.path, ttls={'games': 100, 'grids': 10})
+        cache.put('games-url', 'games', 200, '{"id": 1}', etag='"abc"')
+        cache.put('grids-url', 'grids', 200, '{"data": []}')
+
+        mock_time.return_value = 1050
+        self.assertTrue(cache.get('games-url')['fresh'])
+        self.assertFalse(cache.get('grids-url')['fresh'])
+
+        # Stale entries are still returned so they can be revalidated
+        self.assertEqual(cache.get('games-url')['etag'], '"abc"')
+        cache.close()
+
+    @patch('api_proxies.response_cache.time.time')
+    def test_refresh_extends_lifetime(self, mock_time):
+        mock_time.return_value = 1000
+        cache = ResponseCache(self.path, ttls={'grids': 10})
+        cache.put('grids-url', 'grids', 200, '{}')
+
+        mock_time.return_value = 1020
+        self.assertFalse(cache.get('grids-url')['fresh'])
+        cache.refresh('grids-url', 'grids')
+        self.assertTrue(cache.get('grids-url')['fresh'])
+        cache.close()
+
+    @patch('api_proxies.response_cache.time.time')
+    def test_least_recently_used_entry_is_evicted(self, mock_time):
+        cache = ResponseCache(self.path, max_entries=2)
+        mock_time.return_value = 1
+        cache.put('a', 'games', 200, '{}')
+        mock_time.return_value = 2
+        cache.put('b', 'games', 200, '{}')
+        mock_time.return_value = 3
+        cache.get('a')  # 'b' is now the least recently used
+        mock_time.return_value = 4
+        cache.put('c', 'games', 200, '{}')
+
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+        self.assertIsNotNone(cache.get('c'))
+        cache.close()
+
+    @patch('api_proxies.response_cache.time.time')
+    def test_lookups_are_written_in_batches(self, mock_time):
+        mock_time.return_value = 1
+        cache = ResponseCache(self.path, access_flush_size=3)
+        for key in ('a', 'b', 'c'):
+            cache.put(key, 'games', 200, '{}')
+        writes = cache._conn.total_changes
+
+        mock_time.return_value = 2
+        cache.get('a')
+        cache.get('b')
+        cache.get('b')
+        self.assertEqual(cache._conn.total_changes, writes)
+
+        # The third pending lookup writes all of them at once
+        cache.get('c')
+        self.assertEqual(cache._conn.total_changes, writes + 3)
+        cache.close()
+
+    @patch('api_proxies.response_cache.time.time')
+    def test_flush_persists_access_times(self, mock_time):
+        mock_time.return_value = 1
+        cache = ResponseCache(self.path)
+        cache.put('a', 'games', 200, '{}')
+        mock_time.return_value = 5
+        cache.get('a')
+        cache.flush()
+        last_access = cache._conn.execute('SELECT last_access FROM responses WHERE key = ?', ('a',)).fetchone()[0]
+        self.assertEqual(last_access, 5)
+        cache.close()
+
+    def test_persists_between_instances(self):
+        cache = ResponseCache(self.path)
+        cache.put('a', 'games', 200, '{"id": 1}')
+        cache.close()
+
+        cache = ResponseCache(self.path)
+        self.assertEqual(cache.get('a')['body'], '{"id": 1}')
+        cache.close()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+import struct
+import sys
+import os
+import tempfile
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from steam.constants import ART_FLAGS, ART_GRID, ART_HERO, ART_LOGO
+from steam.steam_appinfo_manager import (
+    APPINFO_MAGIC_V28,
+    APPINFO_MAGIC_V29,
+    parse_appinfo_library_assets,
+)
+
+APPS = {
+    # appid: binary KeyValues tree
+    10: {'appinfo': {'appid': 10, 'common': {
+        'name': 'Counter-Strike',
+        'library_assets': {'library_capsule': 'en', 'library_hero': 'en', 'logo_position': {'pinned_position': 'BottomLeft'}},
+    }}},
+    20: {'appinfo': {'appid': 20, 'common': {'name': 'No Art', 'header_image': {'english': 'header.jpg'}}}},
+    30: {'appinfo': {'appid': 30, 'common': {
+        'library_assets_full': {'library_logo': {'image': {'english': 'logo.png'}}},
+    }, 'extended': {'library_capsule': 'not under common'}}},
+}
+
+
+def encode_kv(tree, key_writer):
+    out = b''
+    for key, value in tree.items():
+        if isinstance(value, dict):
+            out += b'\x00' + key_writer(key) + encode_kv(value, key_writer) + b'\x08'
+        elif isinstance(value, int):
+            out += b'\x02' + key_writer(key) + struct.pack('<i', value)
+        else:
+            out += b'\x01' + key_writer(key) + value.encode('utf-8') + b'\0'
+    return out
+
+
+def build_appinfo(magic):
+    strings = []
+    def key_writer(key):
+        if magic != APPINFO_MAGIC_V29:
+            return key.encode('utf-8') + b'\0'
+        if key not in strings:
+            strings.append(key)
+        return struct.pack('<I', strings.index(key))
+
+    body = b''
+    for appid, tree in APPS.items():
+        kv = encode_kv(tree, key_writer) + b'\x08'
+        entry = struct.pack('<IIQ', 2, 0, 0) + b'\0' * 20 + struct.pack('<I', 1) + b'\0' * 20 + kv
+        body += struct.pack('<II', appid, len(entry)) + entry
+    body += struct.pack('<I', 0)
+
+    if magic != APPINFO_MAGIC_V29:
+        return struct.pack('<II', magic, 1) + body
+    header_size = 16
+    string_table = struct.pack('<I', len(strings)) + b''.join(s.encode('utf-8') + b'\0' for s in strings)
+    return struct.pack('<IIq', magic, 1, header_size + len(body)) + body + string_table
+
+
+class TestSteamAppinfoManager(unittest.TestCase):
+    def parse(self, magic):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, 'appinfo.vdf')
+            with open(path, 'wb') as f:
+                f.write(build_appinfo(magic))
+            return parse_appinfo_library_assets(path)
+
+    def assert_assets(self, assets):
+        self.assertEqual(assets['10'], ART_FLAGS[ART_GRID] | ART_FLAGS[ART_HERO])
+        self.assertEqual(assets['20'], 0)
+        self.assertEqual(assets['30'], ART_FLAGS[ART_LOGO])
+
+    def test_parse_v28_inline_keys(self):
+        self.assert_assets(self.parse(APPINFO_MAGIC_V28))
+
+    def test_parse_v29_string_table_keys(self):
+        self.assert_assets(self.parse(APPINFO_MAGIC_V29))
+
+    def test_unknown_version_raises(self):
+        with self.assertRaises(ValueError):
+            self.parse(0x12345678)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+# Mock requests before importing modules that use it
+class RequestException(Exception):
+    pass
+
+sys.modules['requests'] = MagicMock(RequestException=RequestException)
+
+from api_proxies import steamgriddb_api_proxy
+
+def batch_response(app_ids):
+    response = MagicMock(status_code=200)
+    response.json.return_value = {'success': True, 'data': [
+        {'success': True, 'data': [{'url': f'https://cdn/{app_id}.png'}]} for app_id in app_ids]}
+    return response
+
+class TestSteamGridDbBatches(unittest.TestCase):
+    def setUp(self):
+        self.cache = MagicMock()
+        self.cache.get.return_value = None
+        self.transport = MagicMock()
+        patch('api_proxies.steamgriddb_api_proxy.get_response_cache', return_value=self.cache).start()
+        patch('api_proxies.steamgriddb_api_proxy.get_transport', return_value=self.transport).start()
+        patch('api_proxies.steamgriddb_api_proxy.STEAMGRIDDB_BATCH_SIZE', 2).start()
+        self.addCleanup(patch.stopall)
+
+    def test_failed_batch_keeps_other_batches(self):
+        failed = MagicMock(status_code=500)
+        failed.raise_for_status.side_effect = RequestException('500 Server Error')
+        self.transport.get.side_effect = [batch_response([1, 2]), failed, batch_response([5, 6])]
+
+        urls = steamgriddb_api_proxy.get_urls_from_steam_appids('key', 'grids', [1, 2, 3, 4, 5, 6])
+
+        # The failed appids are left out, not reported as missing art
+        self.assertEqual(urls, {1: 'https://cdn/1.png', 2: 'https://cdn/2.png',
+                                5: 'https://cdn/5.png', 6: 'https://cdn/6.png'})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import unittest
+import sys
+import os
+
+# Add src to path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'src')))
+
+from cloud import sync_manifest
+
+MANIFEST = {
+    '/123/grid/10p.png': {'hash': 'a' * 64, 'timestamp': 1700000000},
+    '/123/grid/20_hero.jpg': {'hash': 'b' * 64, 'timestamp': 0},
+    '/123/grid-non-steam/abc-p.png': {'hash': 'c' * 64},
+    '/123/grid/30.png': {},
+}
+
+class TestSyncManifest(unittest.TestCase):
+    def test_round_trip(self):
+        data = sync_manifest.loads(sync_manifest.dumps(sync_manifest.encode_manifest(MANIFEST, '0001.json')))
+        self.assertEqual(sync_manifest.decode_manifest(data), MANIFEST)
+        self.assertEqual(sync_manifest.get_journal_position(data), '0001.json')
+        # Each folder is stored once
+        self.assertEqual(sorted(data['prefixes']), ['/123/grid', '/123/grid-non-steam'])
+
+    def test_reads_original_format(self):
+        self.assertEqual(sync_manifest.decode_manifest(MANIFEST), MANIFEST)
+        self.assertIsNone(sync_manifest.get_journal_position(MANIFEST))
+        self.assertEqual(sync_manifest.decode_manifest({}), {})
+
+    def test_delta_holds_only_changes(self):
+        new_manifest = {path: dict(entry) for path, entry in MANIFEST.items()}
+        new_manifest['/123/grid/10p.png']['timestamp'] = 1800000000
+        new_manifest['/123/grid/40p.png'] = {'hash': 'd' * 64, 'timestamp': 1800000000}
+        del new_manifest['/123/grid/20_hero.jpg']
+
+        delta = sync_manifest.diff_manifest(MANIFEST, new_manifest)
+        self.assertEqual(len(delta['entries']), 2)
+        self.assertEqual(len(delta['removed']), 1)
+
+        old_manifest = {path: dict(entry) for path, entry in MANIFEST.items()}
+        self.assertEqual(sync_manifest.apply_delta(old_manifest, sync_manifest.loads(sync_manifest.dumps(delta))), new_manifest)
+
+    def test_no_delta_when_unchanged(self):
+        self.assertIsNone(sync_manifest.diff_manifest(MANIFEST, dict(MANIFEST)))
+
+    def test_journal_names_sort_in_upload_order(self):
+        first = sync_manifest.new_journal_name()
+        second = sync_manifest.new_journal_name()
+        self.assertLessEqual(first[:15], second[:15])
+
+if __name__ == '__main__':
+    unittest.main()